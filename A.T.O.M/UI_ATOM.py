@@ -1,4 +1,5 @@
 # A.T.O.M/UI_ATOM.py
+import startup_profile  # keep first: times every import below when ATOM_PROFILE_STARTUP=1
 import os
 import sys
 import ctypes
@@ -12,8 +13,8 @@ from PyQt5.QtGui import QFont, QMovie
 
 # main functions
 import voice_atom
-from tts_atom import speak_response
-from local_engine import download_model_hf, find_local_gguf, load_model, set_manual_model_path 
+from tts_atom import speak_response, preload_tts
+from local_engine import download_model_hf, find_local_gguf, warm_up_model, set_manual_model_path, set_active_model, model_ready, installed_models
 from command import handle_command
 
 # widget panels import
@@ -68,6 +69,7 @@ class SplashScreen(QWidget):
         self.model_combo = QComboBox()
         self.model_combo.addItems(["Phi-3-mini-instruct", "Phi-4-mini-instruct"])
         self.model_combo.setCurrentText(self.model_choice)
+        self.show_installed_models()
         self.model_combo.currentTextChanged.connect(self.save_model_choice)
         self.model_combo.setStyleSheet("""
             QComboBox { background-color: rgba(77,255,219,0.2); color: rgb(77,255,219); font-weight: bold; padding: 5px; border: 1px solid rgb(77,255,219); border-radius: 5px; }
@@ -116,9 +118,22 @@ class SplashScreen(QWidget):
         self.update_status(f"Using folder: {self.download_path}")
 
     # ----------------- Helpers -----------------
+    def show_installed_models(self):
+        # read from the model registry cache: no directory scans or header parsing at startup
+        installed = installed_models()
+        for i in range(self.model_combo.count()):
+            meta = installed.get(self.model_combo.itemText(i))
+            if meta:
+                tip = (f"{meta['file_name']}\n{meta.get('architecture') or '?'} · {meta.get('quantization') or '?'}"
+                       f" · ctx {meta.get('context_length') or '?'} · {meta['size'] / 2**30:.1f} GB")
+                self.model_combo.setItemData(i, tip, Qt.ToolTipRole)
+        if installed:
+            self.label_model.setText(f"Select Model: ({len(installed)} installed)")
+
     def save_model_choice(self, val):
         self.model_choice = val
         self.settings.setValue("model_choice", val)
+        set_active_model(val)  # hot-swap: new requests use it, in-flight ones finish on the old model
 
     def update_status(self, msg):
         self.update_status_signal.emit(msg)
@@ -173,10 +188,12 @@ class SplashScreen(QWidget):
     def _init_model_thread(self):
         if not find_local_gguf(self.model_choice, self.download_path):
             self.update_status("⚠️ Local model not found. Please download or select a folder.")
+            model_ready.set()  # nothing to wait for, let the user type anyway
             return
         try:
-            # load_model will now automatically pick the GGUF in the folder
-            load_model(self.model_choice, save_dir=self.download_path, status_fn=self.update_status)
+            set_active_model(self.model_choice)
+            # page in + load (picks the GGUF in the folder) + warm-up generation; sets model_ready
+            warm_up_model(self.model_choice, save_dir=self.download_path, status_fn=self.update_status)
             self.update_status("✅ Model loaded successfully.")
         except Exception as e:
             self.update_status(f"❌ Error loading model: {e}")
@@ -250,6 +267,7 @@ class AtomUI(QMainWindow):
         self.chat_input = None
         self.keyboard_panel = None
         self.voice_mode = None
+        self.voice_cancel = None  # CancelToken of the voice reply currently being generated
 
         self.init_ui()
 
@@ -266,6 +284,14 @@ class AtomUI(QMainWindow):
 
         self.voice_result.connect(self._on_voice_result)
 
+        # keep the input box disabled until the model is warmed up, so the first query isn't the slow one
+        if not model_ready.is_set():
+            self.terminal_panel.input.setEnabled(False)
+            self.terminal_panel.input.setPlaceholderText("Warming up model...")
+            self.model_ready_timer = QTimer(self)
+            self.model_ready_timer.timeout.connect(self._check_model_ready)
+            self.model_ready_timer.start(200)
+
     def closeEvent(self, event):
         try:
             print("Closing A.T.O.M window... shutting down services.")
@@ -273,6 +299,9 @@ class AtomUI(QMainWindow):
                 voice_atom.stop_listening()
             except Exception as e:
                 print(f"⚠️ Voice listener stop error: {e}")
+            from local_engine import scheduler
+            scheduler.cancel_all()  # stop any generation still running for this window
+            self.terminal_panel.stop_summaries()  # after cancel_all: nothing queued ahead keeps them waiting
         except Exception as e:
             print(f"⚠️ Error during shutdown: {e}")
         event.accept()
@@ -509,15 +538,17 @@ class AtomUI(QMainWindow):
                 from tts_atom import speak_response
                 threading.Thread(target=lambda: speak_response(resp), daemon=True).start()
             else:
+                from local_engine import CancelToken
+                # a new utterance supersedes the reply still being generated for the previous one
+                if self.voice_cancel:
+                    self.voice_cancel.cancel()
+                self.voice_cancel = cancel = CancelToken()
+
                 def do_ai():
                     try:
-                        from local_engine import get_response_from_atom
-                        reply = get_response_from_atom(text)
-                        QMetaObject.invokeMethod(self.terminal_panel, "append_message",
-                                                Qt.QueuedConnection,
-                                                QtCore.Q_ARG(str, f"🗨️ A.T.O.M: {reply}"))
-                        from tts_atom import speak_response
-                        speak_response(reply)
+                        # same conversation as the terminal; tokens show up as they arrive and TTS starts at the first sentence
+                        session = self.terminal_panel.session
+                        self.terminal_panel.stream_atom_reply(session.stream_reply(text, cancel_token=cancel), speak=True)
                     except Exception as e:
                         QMetaObject.invokeMethod(self.terminal_panel, "append_message",
                                                 Qt.QueuedConnection,
@@ -544,12 +575,23 @@ class AtomUI(QMainWindow):
 
         self.voice_mode = None
         self.silence_timer.stop()
+        if self.voice_cancel:
+            self.voice_cancel.cancel()
+            self.voice_cancel = None
 
         QMetaObject.invokeMethod(self, "set_mic_state", Qt.QueuedConnection,
                                 QtCore.Q_ARG(object, None))
         QMetaObject.invokeMethod(self.terminal_panel, "append_message", Qt.QueuedConnection,
                                 QtCore.Q_ARG(str, "Voice mode stopped. Click 🎙️ to start again."))
 
+    def _check_model_ready(self):
+        if not model_ready.is_set():
+            return
+        self.model_ready_timer.stop()
+        self.terminal_panel.input.setEnabled(True)
+        self.terminal_panel.input.setPlaceholderText("Type your message here and press Enter...")
+        self.terminal_panel.input.setFocus()
+
     @QtCore.pyqtSlot()
     def _auto_stop_due_to_silence(self):
         QMetaObject.invokeMethod(self.terminal_panel, "append_message", Qt.QueuedConnection,
@@ -654,6 +696,10 @@ if __name__ == "__main__":
     splash = SplashScreen()
     splash.show()
     QApplication.processEvents()  # make sure UI updates immediately
+    startup_profile.mark("first paint (splash)")
+
+    # heavy subsystems load in the background once something is on screen
+    preload_tts()
 
     main_window = None
 
@@ -666,7 +712,9 @@ if __name__ == "__main__":
         sys.stderr = StreamRedirector(main_window.terminal_panel.append_message)
         main_window.show()
         splash.close()
+        startup_profile.mark("main window shown")
         print("✅ A.T.O.M is online. Terminal ready.")
+        startup_profile.finish()
 
     # Connect the splash's ready_to_launch signal to launch_main_ui
     splash.ready_to_launch.connect(launch_main_ui)
@@ -0,0 +1,139 @@
+# A.T.O.M/autotune.py
+import json
+import os
+import time
+from pathlib import Path
+
+import psutil
+from PyQt5.QtCore import QSettings
+
+# Fixed prompt so numbers are comparable between runs and machines
+BENCH_PROMPT = (
+    "You are A.T.O.M, a local assistant. Explain in a few sentences how a computer's CPU, RAM and "
+    "storage work together when a program is opened, and why closing unused programs can make the "
+    "system feel faster. Keep the answer short and simple."
+)
+BENCH_TOKENS = 32
+BATCH_SIZES = (8, 32, 128, 512)
+
+
+def _settings():
+    return QSettings("A.T.O.M", "Config")
+
+
+def _tuning_key(gguf_path):
+    return f"tuning/{Path(gguf_path).name}"
+
+
+# ---------------- Stored configuration ---------------- #
+def load_tuning(gguf_path):
+    """Return the stored {'threads', 'batch_size', ...} for this GGUF, or None if not tuned (or file changed)."""
+    raw = _settings().value(_tuning_key(gguf_path), None)
+    if not raw:
+        return None
+    try:
+        config = json.loads(raw)
+    except ValueError:
+        return None
+    try:
+        if config.get("file_size") != os.path.getsize(gguf_path):
+            return None
+    except OSError:
+        return None
+    return config
+
+
+def save_tuning(gguf_path, config):
+    config = dict(config, file_size=os.path.getsize(gguf_path))
+    _settings().setValue(_tuning_key(gguf_path), json.dumps(config))
+
+
+def clear_tuning(gguf_path):
+    _settings().remove(_tuning_key(gguf_path))
+
+
+# ---------------- Benchmark ---------------- #
+def candidate_threads():
+    physical = psutil.cpu_count(logical=False) or 1
+    logical = psutil.cpu_count(logical=True) or physical
+    values = {max(1, physical // 2), max(1, physical - 1), physical, logical}
+    # never more than the LLM's cores from the thread budget (the inference thread is pinned to them)
+    from thread_budget import cores_for
+    limit = len(cores_for("llm"))
+    return sorted({min(v, limit) for v in values})
+
+
+def benchmark(threads, batch_size, prompt=BENCH_PROMPT, gen_tokens=BENCH_TOKENS, model_name=None):
+    """Run one generation with the given settings; returns prompt-eval and generation tokens/sec."""
+    from local_engine import load_model, scheduler, PRIORITY_INTERACTIVE
+
+    prompt_tokens = len(load_model(model_name).tokenize(prompt))
+    request = scheduler.submit(prompt, priority=PRIORITY_INTERACTIVE, model_name=model_name, max_new_tokens=gen_tokens,
+                               temperature=0, threads=threads, batch_size=batch_size)
+    start = time.perf_counter()
+    first = None
+    count = 0
+    for _ in request.tokens():
+        if first is None:
+            first = time.perf_counter()
+        count += 1
+    end = time.perf_counter()
+    if first is None:
+        return {"threads": threads, "batch_size": batch_size, "prompt_tps": 0.0, "gen_tps": 0.0}
+    return {
+        "threads": threads,
+        "batch_size": batch_size,
+        "prompt_tps": prompt_tokens / max(first - start, 1e-6),
+        "gen_tps": (count - 1) / max(end - first, 1e-6) if count > 1 else 0.0,
+    }
+
+
+def autotune_model(model_name=None, save_dir=None, status_fn=None):
+    """
+    Find the fastest threads / batch_size for the local CPU and store them for the model's GGUF.
+    Threads are picked on generation speed, then batch size on prompt-eval speed at those threads.
+    """
+    from local_engine import load_model, get_user_settings, preferred_gguf
+
+    model_name = model_name or get_user_settings()[0]
+    gguf_path = preferred_gguf(model_name, save_dir=save_dir)  # the file load_model loads (and load_tuning looks up)
+    if not gguf_path:
+        if status_fn: status_fn(f"❌ No local GGUF for '{model_name}' to tune.")
+        return None
+    load_model(model_name, save_dir=save_dir, status_fn=status_fn)
+    benchmark(candidate_threads()[-1], BATCH_SIZES[0], gen_tokens=2, model_name=model_name)  # warm-up, not measured
+
+    results = []
+    default_batch = BATCH_SIZES[-1]
+    for threads in candidate_threads():
+        if status_fn: status_fn(f"⏱️ Tuning: threads={threads} batch_size={default_batch} ...")
+        results.append(benchmark(threads, default_batch, model_name=model_name))
+    best_threads = max(results, key=lambda r: r["gen_tps"])["threads"]
+
+    for batch_size in BATCH_SIZES[:-1]:
+        if status_fn: status_fn(f"⏱️ Tuning: threads={best_threads} batch_size={batch_size} ...")
+        results.append(benchmark(best_threads, batch_size, model_name=model_name))
+    at_best = [r for r in results if r["threads"] == best_threads]
+    best = max(at_best, key=lambda r: r["prompt_tps"])
+
+    config = {
+        "threads": best["threads"],
+        "batch_size": best["batch_size"],
+        "prompt_tps": round(best["prompt_tps"], 2),
+        "gen_tps": round(max(r["gen_tps"] for r in at_best), 2),
+    }
+    save_tuning(gguf_path, config)
+    # the loaded model uses its config as per-call defaults, so the new values apply right away
+    model = load_model(model_name, save_dir=save_dir)
+    if hasattr(model, "config"):
+        model.config.threads = config["threads"]
+        model.config.batch_size = config["batch_size"]
+    if status_fn:
+        status_fn(f"✅ Tuned {Path(gguf_path).name}: threads={config['threads']} batch_size={config['batch_size']} "
+                  f"({config['gen_tps']} tok/s generation, {config['prompt_tps']} tok/s prompt)")
+    return config
+
+
+if __name__ == "__main__":
+    import sys
+    autotune_model(sys.argv[1] if len(sys.argv) > 1 else None, status_fn=print)
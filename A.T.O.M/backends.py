@@ -0,0 +1,172 @@
+# A.T.O.M/backends.py
+import json
+
+# Every backend is used the same way by local_engine / the scheduler:
+#   model = Backend().load(...)
+#   model(prompt, stream=True, max_new_tokens=..., temperature=..., top_p=..., threads=..., batch_size=...)
+#   model.tokenize(text)
+# which is the calling convention ctransformers models already had.
+
+
+class InferenceBackend:
+    name = None
+    uses_local_file = True  # False = the weights live somewhere else (e.g. an Ollama daemon)
+
+    def __init__(self):
+        self.context_length = 4096
+
+    def load(self, model, context_length=4096, gpu_layers=0, threads=None, batch_size=None, model_type=None):
+        """
+        `model` is a GGUF path, or a model tag for backends with uses_local_file = False. Returns self.
+        model_type is the ctransformers architecture name (from the GGUF header, see model_registry.py).
+        """
+        raise NotImplementedError
+
+    def stream(self, prompt, max_new_tokens=256, temperature=0.7, top_p=0.9, threads=None, batch_size=None,
+               **kwargs):
+        raise NotImplementedError
+
+    def generate(self, prompt, **kwargs):
+        return "".join(self.stream(prompt, **kwargs))
+
+    def tokenize(self, text):
+        raise NotImplementedError
+
+    def __call__(self, prompt, stream=False, **kwargs):
+        return self.stream(prompt, **kwargs) if stream else self.generate(prompt, **kwargs)
+
+
+# ---------------- ctransformers ---------------- #
+class CTransformersBackend(InferenceBackend):
+    name = "ctransformers"
+
+    def load(self, model, context_length=4096, gpu_layers=0, threads=None, batch_size=None, model_type=None):
+        from ctransformers import AutoModelForCausalLM
+
+        tuned = {k: v for k, v in (("threads", threads), ("batch_size", batch_size)) if v is not None}
+        self.llm = AutoModelForCausalLM.from_pretrained(
+            str(model),
+            model_type=model_type or "phi",
+            gpu_layers=gpu_layers,
+            context_length=context_length,
+            **tuned,
+        )
+        self.context_length = context_length
+        return self
+
+    @property
+    def config(self):
+        # per-call defaults (threads, batch_size, ...) — autotune updates these in place
+        return self.llm.config
+
+    def stream(self, prompt, **kwargs):
+        return self.llm(prompt, stream=True, **kwargs)
+
+    def generate(self, prompt, **kwargs):
+        return self.llm(prompt, **kwargs)
+
+    def tokenize(self, text):
+        return self.llm.tokenize(text)
+
+
+# ---------------- llama-cpp-python ---------------- #
+class LlamaCppBackend(InferenceBackend):
+    name = "llama_cpp"
+
+    def load(self, model, context_length=4096, gpu_layers=0, threads=None, batch_size=None, model_type=None):
+        from llama_cpp import Llama
+
+        options = {"n_threads": threads} if threads else {}
+        if batch_size:
+            options["n_batch"] = batch_size
+        self.llm = Llama(model_path=str(model), n_ctx=context_length, n_gpu_layers=gpu_layers, verbose=False,
+                         **options)
+        self.context_length = context_length
+        return self
+
+    def stream(self, prompt, max_new_tokens=256, temperature=0.7, top_p=0.9, threads=None, batch_size=None,
+               **kwargs):
+        # llama.cpp fixes threads / batch size at load time, so per-call values are ignored
+        for chunk in self.llm(prompt, max_tokens=max_new_tokens, temperature=temperature, top_p=top_p, stream=True):
+            yield chunk["choices"][0]["text"]
+
+    def tokenize(self, text):
+        return self.llm.tokenize(text.encode("utf-8"), add_bos=False)
+
+
+# ---------------- Ollama (HTTP) ---------------- #
+class OllamaBackend(InferenceBackend):
+    """
+    Talks to an Ollama daemon (local or shared) instead of loading weights in-process.
+    One requests.Session keeps the HTTP connections alive between calls; replies are streamed NDJSON.
+    """
+    name = "ollama"
+    uses_local_file = False
+    DEFAULT_URL = "http://127.0.0.1:11434"
+
+    def __init__(self, base_url=None, keep_alive="30m", session=None):
+        super().__init__()
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.base_url = (base_url or self.DEFAULT_URL).rstrip("/")
+        self.keep_alive = keep_alive
+        self.session = session or requests.Session()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=4)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.model = None
+
+    def load(self, model, context_length=4096, gpu_layers=0, threads=None, batch_size=None, model_type=None):
+        self.model = model
+        self.context_length = context_length
+        self.options = {"num_ctx": context_length}
+        if threads:
+            self.options["num_thread"] = threads
+        if batch_size:
+            self.options["num_batch"] = batch_size
+        r = self.session.get(f"{self.base_url}/api/tags", timeout=5)
+        r.raise_for_status()
+        tags = [m.get("name", "") for m in r.json().get("models", [])]
+        if tags and not any(t == model or t.split(":")[0] == model for t in tags):
+            raise RuntimeError(f"Ollama at {self.base_url} has no model '{model}' (run: ollama pull {model})")
+        # empty prompt = load the weights on the daemon without generating
+        self.session.post(f"{self.base_url}/api/generate",
+                          json={"model": model, "prompt": "", "keep_alive": self.keep_alive}, timeout=300)
+        return self
+
+    def stream(self, prompt, max_new_tokens=256, temperature=0.7, top_p=0.9, threads=None, batch_size=None,
+               **kwargs):
+        options = dict(self.options, num_predict=max_new_tokens, temperature=temperature, top_p=top_p)
+        if threads:
+            options["num_thread"] = threads
+        if batch_size:
+            options["num_batch"] = batch_size
+        payload = {"model": self.model, "prompt": prompt, "stream": True, "raw": True,
+                   "keep_alive": self.keep_alive, "options": options}
+        with self.session.post(f"{self.base_url}/api/generate", json=payload, stream=True, timeout=300) as r:
+            r.raise_for_status()
+            for line in r.iter_lines():
+                if not line:
+                    continue
+                data = json.loads(line)
+                if data.get("error"):
+                    raise RuntimeError(data["error"])
+                if data.get("response"):
+                    yield data["response"]
+                if data.get("done"):
+                    break
+
+    def tokenize(self, text):
+        # Ollama has no tokenize endpoint; ~4 characters per token is close enough for budgeting
+        return [0] * max(1, len(text) // 4)
+
+
+BACKENDS = {cls.name: cls for cls in (CTransformersBackend, LlamaCppBackend, OllamaBackend)}
+
+
+def create_backend(name, **options):
+    cls = BACKENDS.get(name)
+    if cls is None:
+        raise ValueError(f"Unknown backend '{name}'. Choose one of: {', '.join(BACKENDS)}")
+    return cls(**options)
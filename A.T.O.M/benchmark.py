@@ -0,0 +1,290 @@
+# A.T.O.M/benchmark.py
+"""
+LLM micro-benchmarks.
+
+    python benchmark.py                 # every AVAILABLE_MODELS entry x every local GGUF quantization
+    python benchmark.py --fake          # deterministic fake backend, no model files needed (CI)
+    python benchmark.py --out bench.json
+    python benchmark.py --extract DIR   # PDF extraction backends (PyMuPDF, PyPDF2; serial and process pool) on DIR
+
+Results are written as JSON so runs can be compared across releases.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import threading
+import time
+from pathlib import Path
+
+import psutil
+
+BENCH_PROMPT = (
+    "Summarize in two sentences why local language models are useful for privacy, "
+    "and name one drawback of running them on a laptop CPU."
+)
+BENCH_TOKENS = 64
+FAKE_MODEL = "fake-backend"
+
+
+# ---------------- Fake backend ---------------- #
+class FakeLLM:
+    """
+    Stands in for a ctransformers model: same call/stream/tokenize surface, fixed output and
+    sleep-based timing (prompt eval per input token, then a steady generation rate).
+    """
+
+    WORDS = ("The", " quick", " brown", " fox", " jumps", " over", " the", " lazy", " dog", ".")
+
+    def __init__(self, prompt_tps=400.0, gen_tps=40.0, load_seconds=0.0, context_length=4096):
+        self.prompt_tps = prompt_tps
+        self.gen_tps = gen_tps
+        self.context_length = context_length
+        time.sleep(load_seconds)
+
+    def tokenize(self, text, add_bos_token=None):
+        return list(range(len(text.split())))
+
+    def detokenize(self, tokens):
+        return "".join(self.WORDS[t % len(self.WORDS)] for t in tokens)
+
+    def _generate(self, prompt, max_new_tokens):
+        time.sleep(len(self.tokenize(prompt)) / self.prompt_tps)
+        for i in range(max_new_tokens):
+            time.sleep(1.0 / self.gen_tps)
+            yield self.WORDS[i % len(self.WORDS)]
+
+    def __call__(self, prompt, max_new_tokens=256, stream=False, **kwargs):
+        tokens = self._generate(prompt, max_new_tokens)
+        return tokens if stream else "".join(tokens)
+
+
+# ---------------- Measurement helpers ---------------- #
+class PeakRSS:
+    """Samples this process' RSS in the background; `peak` is the highest value seen (bytes)."""
+
+    def __init__(self, interval=0.05):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        proc = psutil.Process()
+        self.peak = proc.memory_info().rss
+
+        def sample():
+            while not self._stop.wait(self.interval):
+                self.peak = max(self.peak, proc.memory_info().rss)
+
+        self._thread = threading.Thread(target=sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, psutil.Process().memory_info().rss)
+
+
+def measure_generation(model_name, prompt=BENCH_PROMPT, max_tokens=BENCH_TOKENS):
+    """One uncached generation through the normal scheduler path."""
+    from local_engine import load_model, stream_response_from_atom
+
+    prompt_tokens = len(load_model(model_name).tokenize(prompt))
+    start = time.perf_counter()
+    first = None
+    count = 0
+    for _ in stream_response_from_atom(prompt, max_tokens=max_tokens, temperature=0, cache=False,
+                                       model_name=model_name):
+        if first is None:
+            first = time.perf_counter()
+        count += 1
+    end = time.perf_counter()
+    first = first or end
+    return {
+        "prompt_tokens": prompt_tokens,
+        "generated_tokens": count,
+        "ttft_s": round(first - start, 4),
+        "prompt_eval_tps": round(prompt_tokens / max(first - start, 1e-6), 2),
+        "gen_tps": round((count - 1) / max(end - first, 1e-6), 2) if count > 1 else 0.0,
+        "total_s": round(end - start, 4),
+    }
+
+
+def _bench_model(name, loader, status_fn):
+    from local_engine import model_pool
+
+    model_pool.evict(name)
+    with PeakRSS() as rss:
+        start = time.perf_counter()
+        model_pool.get(name, loader)
+        load_s = time.perf_counter() - start
+        result = measure_generation(name)
+    model_pool.evict(name)
+    result.update({"model": name, "load_s": round(load_s, 4), "peak_rss_mb": round(rss.peak / 2**20, 1)})
+    if status_fn:
+        status_fn(f"⏱️ {name}: ttft {result['ttft_s']}s, {result['gen_tps']} tok/s, load {result['load_s']}s")
+    return result
+
+
+# ---------------- Pipeline overhead ---------------- #
+def _time_stage(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return round((time.perf_counter() - start) / repeat * 1e6, 2)  # microseconds per call
+
+
+def measure_pipeline(repeat=200):
+    """Per-call cost of the code around the model: command routing, reply formatting, TTS queueing."""
+    stages = {}
+    sample_reply = "Sure. Here is an example:\n```python\ndef add(a, b):\n    return a + b\n```\nHope that helps!"
+
+    try:
+        from command import handle_command
+        utterances = ["what time is it", "tell me a joke about cats", "system status please"]
+        stages["command_routing_us"] = _time_stage(lambda: [handle_command(u) for u in utterances], repeat)
+    except Exception as e:
+        stages["command_routing_us"] = f"skipped: {e}"
+
+    try:
+        from panels.TerminalPanel import TerminalChat
+        stages["format_response_us"] = _time_stage(lambda: TerminalChat._format_response(None, sample_reply), repeat)
+    except Exception as e:
+        stages["format_response_us"] = f"skipped: {e}"
+
+    try:
+        import tts_atom
+        queued = []
+        original = tts_atom.speak_response
+        tts_atom.speak_response = queued.append  # measure sentence splitting + queueing, not synthesis
+        try:
+            stages["tts_queueing_us"] = _time_stage(lambda: list(tts_atom.speak_stream(iter(sample_reply.split(" ")))),
+                                                    repeat)
+        finally:
+            tts_atom.speak_response = original
+    except Exception as e:
+        stages["tts_queueing_us"] = f"skipped: {e}"
+
+    return stages
+
+
+# ---------------- Document extraction ---------------- #
+def measure_extraction(path, backend, parallel=False):
+    """Full page-by-page extraction of one PDF with `backend`, plus the latency to its first page."""
+    from extraction import iter_pdf
+
+    pages = chars = 0
+    first_page_ms = None
+    with PeakRSS() as rss:
+        start = time.perf_counter()
+        for text in iter_pdf(path, backend=backend, parallel=parallel):
+            if first_page_ms is None:
+                first_page_ms = (time.perf_counter() - start) * 1000
+            pages += 1
+            chars += len(text)
+        seconds = time.perf_counter() - start
+    return {"pages": pages, "chars": chars, "seconds": round(seconds, 3),
+            "pages_per_s": round(pages / seconds, 1) if seconds else None,
+            "first_page_ms": round(first_page_ms, 1) if first_page_ms is not None else None,
+            "peak_rss_mb": round(rss.peak / 2**20, 1)}
+
+
+def run_extraction_benchmark(corpus, out_path=None, status_fn=print):
+    from extraction import available_pdf_backends
+
+    files = sorted(str(p) for p in Path(corpus).rglob("*") if p.suffix.lower() == ".pdf")
+    backends = {}
+    for backend, parallel in [(b, p) for b in available_pdf_backends() for p in (False, True)]:
+        label = f"{backend} (process pool)" if parallel else backend
+        per_file, pages, seconds = {}, 0, 0.0
+        for path in files:
+            try:
+                result = measure_extraction(path, backend, parallel)
+            except Exception as e:
+                per_file[path] = {"error": str(e)}
+                continue
+            per_file[path] = result
+            pages += result["pages"]
+            seconds += result["seconds"]
+        backends[label] = {"files": per_file, "pages": pages, "seconds": round(seconds, 3),
+                             "pages_per_s": round(pages / seconds, 1) if seconds else None}
+        if status_fn: status_fn(f"📄 {label}: {pages} pages in {seconds:.2f}s")
+
+    report = {
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "machine": _machine(),
+        "corpus": os.path.abspath(corpus),
+        "backends": backends,
+    }
+    out_path = out_path or f"extraction-{datetime.datetime.now():%Y%m%d-%H%M%S}.json"
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    if status_fn: status_fn(f"✅ Benchmark written to {os.path.abspath(out_path)}")
+    return report
+
+
+# ---------------- Entry point ---------------- #
+def _machine():
+    return {
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "physical_cores": psutil.cpu_count(logical=False),
+        "logical_cores": psutil.cpu_count(logical=True),
+        "ram_gb": round(psutil.virtual_memory().total / 2**30, 1),
+    }
+
+
+def _backend():
+    """The configured inference backend, as recorded in the report."""
+    from local_engine import get_backend_name
+    from PyQt5.QtCore import QSettings
+
+    backend = {"backend": get_backend_name()}
+    if backend["backend"] == "process":
+        backend["process_backend"] = QSettings("A.T.O.M", "Config").value("process_backend", "ctransformers")
+    return backend
+
+
+def run_benchmark(fake=False, out_path=None, status_fn=print):
+    from local_engine import AVAILABLE_MODELS, list_local_ggufs, load_gguf
+
+    results = []
+    if fake:
+        results.append(_bench_model(FAKE_MODEL, lambda: (FakeLLM(load_seconds=0.05), Path(__file__)), status_fn))
+    else:
+        for name in AVAILABLE_MODELS:
+            for gguf in list_local_ggufs(name):
+                label = f"{name} [{gguf.name}]"
+                try:
+                    results.append(_bench_model(label, lambda g=gguf: (load_gguf(g), g), status_fn))
+                except Exception as e:
+                    results.append({"model": label, "error": str(e)})
+                    if status_fn: status_fn(f"⚠️ {label}: {e}")
+
+    report = {
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        **({"backend": "fake"} if fake else _backend()),
+        "machine": _machine(),
+        "models": results,
+        "pipeline": measure_pipeline(),
+    }
+    out_path = out_path or f"benchmark-{datetime.datetime.now():%Y%m%d-%H%M%S}.json"
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    if status_fn: status_fn(f"✅ Benchmark written to {os.path.abspath(out_path)}")
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="A.T.O.M LLM micro-benchmarks")
+    parser.add_argument("--fake", action="store_true", help="use the deterministic fake backend")
+    parser.add_argument("--out", help="JSON output path")
+    parser.add_argument("--extract", metavar="DIR", help="benchmark PDF extraction backends on DIR instead")
+    args = parser.parse_args()
+    if args.extract:
+        run_extraction_benchmark(args.extract, out_path=args.out)
+    else:
+        run_benchmark(fake=args.fake, out_path=args.out)
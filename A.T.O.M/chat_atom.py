@@ -1,8 +1,9 @@
 # A.T.O.M/chat_atom.py
 from PyQt5.QtCore import QThread, pyqtSignal
-from local_engine import get_response_from_atom
+from local_engine import stream_response_from_atom
 
 class LLMWorker(QThread):
+    token = pyqtSignal(str)     # emits each piece of text as it is generated
     finished = pyqtSignal(str)  # emits full response once
 
     def __init__(self, prompt: str, model: str = "phi3", parent=None):
@@ -12,7 +13,10 @@ class LLMWorker(QThread):
 
     def run(self):
         try:
-            response = get_response_from_atom(self.prompt)
+            response = ""
+            for piece in stream_response_from_atom(self.prompt, cache=True):
+                response += piece
+                self.token.emit(piece)
             self.finished.emit(response)
         except Exception as e:
             self.finished.emit(f"[Error: {e}]")
@@ -5,12 +5,9 @@ import webbrowser
 import datetime
 import psutil
 import difflib
-import win32com.client # For COM interaction with Windows Shell to open apps from windows virtual AppsFolder
-import pythoncom # For COM initialization
 import time
-from PyPDF2 import PdfReader  # for PDF text extraction
-from docx import Document # for DOCX text extraction
-from summarizer import summarize_text # summarize_text function from summarizer.py
+# win32com / pythoncom, PyPDF2, docx and summarizer (-> local_engine) are imported inside the
+# functions that use them, so importing command at UI startup stays cheap.
 
 # --- Global reference to terminal widget for interactive commands --- #
 terminal_widget_ref = None  # Will be set from UI_ATOM
@@ -35,6 +32,9 @@ def launch_custom_app(name):
 
 # --- AppsFolder launcher (for Windows) --- #
 def launch_app_from_appsfolder(app_name: str):
+    import win32com.client # For COM interaction with Windows Shell to open apps from windows virtual AppsFolder
+    import pythoncom # For COM initialization
+
     app_name = app_name.lower().strip()
 
     # Initialize COM for this thread
@@ -56,32 +56,16 @@ def launch_app_from_appsfolder(app_name: str):
 
 # summarizer handeler
 def summarize_file(file_path):
+    import summarizer  # same chunked pipeline as the terminal's "+" button
+
     ext = os.path.splitext(file_path)[1].lower()
-    text = ""
+    if ext not in summarizer.SUPPORTED_EXTENSIONS:
+        return "⚠️ Unsupported file type. Please use .txt, .pdf, or .docx"
 
     try:
-        if ext == ".txt":
-            with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
-                text = f.read()
-
-        elif ext == ".pdf":
-            reader = PdfReader(file_path)
-            for page in reader.pages:
-                text += page.extract_text() or ""
-
-        elif ext == ".docx":
-            doc = Document(file_path)
-            for para in doc.paragraphs:
-                text += para.text + "\n"
-
-        else:
-            return "⚠️ Unsupported file type. Please use .txt, .pdf, or .docx"
-
-        if not text.strip():
-            return "⚠️ No readable text found in the document."
-
-        summary = summarize_text(text)
-        return summary
+        # streamed: the document is read page by page instead of being loaded whole
+        summary = summarizer.summarize_file(file_path)
+        return summary or "⚠️ No readable text found in the document."
 
     except Exception as e:
         return f"⚠️ Error summarizing file: {e}"
@@ -114,6 +98,10 @@ def system_status():
     ram = psutil.virtual_memory().percent
     return f"CPU usage is {cpu}%, RAM usage is {ram}%."
 
+def atom_resources():
+    from resources import monitor
+    return monitor.report()
+
 def info_about_atom():
     return "I am ATOM, a LLM based on Microsoft's PHI-3 model. How can I assist you today?"
 
@@ -136,6 +124,8 @@ command_map = {
     "system info": system_status,
     "sys info": system_status,
     "sys status": system_status,
+    "atom resources": atom_resources,
+    "resource usage": atom_resources,
     "who are you?": info_about_atom,
     "quit": quit,
     "exit": quit,
@@ -0,0 +1,131 @@
+# A.T.O.M/conversation.py
+import threading
+
+from local_engine import (
+    load_model, get_active_model, get_response_from_atom, stream_response_from_atom, CancelToken, PRIORITY_BATCH
+)
+
+SYSTEM_PROMPT = "You are A.T.O.M, a helpful offline desktop assistant. Answer clearly and concisely."
+SUMMARY_PROMPT = (
+    "Update the summary of this conversation between a user and the assistant A.T.O.M. "
+    "Keep names, facts, decisions and open questions; drop small talk. Reply with the summary only.\n\n"
+    "Current summary:\n{summary}\n\nNew conversation turns:\n{turns}\n\nUpdated summary:"
+)
+
+
+class ConversationSession:
+    """
+    Chat history shared by the terminal and voice mode, packed into the model's context window.
+
+    Prompts use the Phi chat format. The newest turns that fit (context minus the reply reservation)
+    are sent verbatim; once the history grows past `compact_at` of that budget, everything except
+    the last `keep_recent` turns is folded into a rolling summary by a background batch request.
+    Token counts come from the model's own tokenizer and are cached on each message.
+    """
+
+    def __init__(self, model_name=None, system_prompt=SYSTEM_PROMPT, max_reply_tokens=1024,
+                 compact_at=0.75, keep_recent=4):
+        self.model_name = model_name
+        self.system_prompt = system_prompt
+        self.max_reply_tokens = max_reply_tokens
+        self.compact_at = compact_at
+        self.keep_recent = keep_recent
+        self.messages = []  # {"role": "user"|"assistant", "text": str, "tokens": int}
+        self.summary = ""
+        self._lock = threading.RLock()
+        self._compacting = False
+
+    # ---------------- Token accounting ---------------- #
+    def _model(self):
+        return load_model(self.model_name or get_active_model())
+
+    def count_tokens(self, text):
+        return len(self._model().tokenize(text))
+
+    def _budget(self):
+        context = getattr(self._model(), "context_length", 4096)
+        return context - self.max_reply_tokens - self.count_tokens(self._format_system())
+
+    def _format_system(self):
+        system = self.system_prompt
+        if self.summary:
+            system += f"\n\nSummary of the earlier conversation:\n{self.summary}"
+        return f"<|system|>\n{system}<|end|>\n"
+
+    @staticmethod
+    def _format_turn(role, text):
+        return f"<|{role}|>\n{text}<|end|>\n"
+
+    def _add(self, role, text):
+        message = {"role": role, "text": text}
+        message["tokens"] = self.count_tokens(self._format_turn(role, text))
+        with self._lock:
+            self.messages.append(message)
+
+    # ---------------- Prompt packing ---------------- #
+    def build_prompt(self, user_text):
+        """System prompt + rolling summary + as many of the newest turns as fit + the new user turn."""
+        with self._lock:
+            budget = self._budget() - self.count_tokens(self._format_turn("user", user_text))
+            packed = []
+            for message in reversed(self.messages):
+                if message["tokens"] > budget:
+                    break
+                budget -= message["tokens"]
+                packed.append(message)
+            turns = "".join(self._format_turn(m["role"], m["text"]) for m in reversed(packed))
+            return self._format_system() + turns + self._format_turn("user", user_text) + "<|assistant|>\n"
+
+    def stream_reply(self, user_text, **kwargs):
+        """
+        Stream the model's reply to user_text with the conversation as context, then record the turn.
+        A reply that was cancelled (or whose iterator was abandoned) is not recorded: its text is cut
+        off, and later prompts would present it as a complete answer.
+        """
+        prompt = self.build_prompt(user_text)
+        cancel_token = kwargs.pop("cancel_token", None) or CancelToken()
+        reply = ""
+        kwargs.setdefault("cache", True)  # the same question with the same history gets the stored answer
+        for token in stream_response_from_atom(prompt, max_tokens=self.max_reply_tokens, cancel_token=cancel_token,
+                                               model_name=self.model_name, **kwargs):
+            reply += token
+            yield token
+        if reply.strip() and not cancel_token.cancelled:
+            self._add("user", user_text)
+            self._add("assistant", reply.strip())
+            threading.Thread(target=self.compact_if_needed, daemon=True).start()
+
+    def reply(self, user_text, **kwargs):
+        return "".join(self.stream_reply(user_text, **kwargs))
+
+    # ---------------- Rolling summary ---------------- #
+    def history_tokens(self):
+        with self._lock:
+            return sum(m["tokens"] for m in self.messages)
+
+    def compact_if_needed(self):
+        with self._lock:
+            if self._compacting or self.history_tokens() <= self.compact_at * self._budget():
+                return
+            if len(self.messages) <= self.keep_recent:
+                return
+            self._compacting = True
+            old = self.messages[:-self.keep_recent]
+            summary = self.summary
+        try:
+            turns = "".join(f"{m['role'].upper()}: {m['text']}\n" for m in old)
+            new_summary = get_response_from_atom(SUMMARY_PROMPT.format(summary=summary or "(none)", turns=turns),
+                                                 max_tokens=256, temperature=0, priority=PRIORITY_BATCH,
+                                                 model_name=self.model_name).strip()
+            if new_summary:
+                with self._lock:
+                    self.summary = new_summary
+                    self.messages = self.messages[len(old):]
+        finally:
+            with self._lock:
+                self._compacting = False
+
+    def reset(self):
+        with self._lock:
+            self.messages = []
+            self.summary = ""
@@ -0,0 +1,192 @@
+# A.T.O.M/downloader.py
+import hashlib
+import json
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import requests
+
+CHUNK_SIZE = 1024 * 1024
+MIN_SEGMENT = 16 * 1024 * 1024  # don't split files smaller than this across connections
+
+
+# ---------------- Remote file info ---------------- #
+def remote_file_info(url, session=None):
+    """
+    HEAD the url (following redirects) and return (size, supports_ranges, sha256).
+    Hugging Face puts the LFS sha256 in X-Linked-Etag on the first (redirect) response.
+    """
+    http = session or requests
+    r = http.head(url, allow_redirects=True, timeout=30)
+    r.raise_for_status()
+    size = int(r.headers.get("content-length", 0)) or None
+    ranges = r.headers.get("accept-ranges", "").lower() == "bytes"
+    sha256 = None
+    for resp in list(r.history) + [r]:
+        for header in ("x-linked-etag", "etag"):
+            value = resp.headers.get(header, "").strip('"').removeprefix("W/").strip('"')
+            if re.fullmatch(r"[0-9a-f]{64}", value):
+                sha256 = value
+        linked_size = resp.headers.get("x-linked-size")
+        if linked_size and not size:
+            size = int(linked_size)
+    return size, ranges, sha256
+
+
+def sha256_of(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(CHUNK_SIZE), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+# ---------------- Download ---------------- #
+class _Progress:
+    def __init__(self, total, progress_fn):
+        self.total = total
+        self.done = 0
+        self.progress_fn = progress_fn
+        self.lock = threading.Lock()
+        self._last = -1
+
+    def add(self, n):
+        with self.lock:
+            self.done += n
+            pct = int(self.done / self.total * 100) if self.total else 0
+            if self.progress_fn and pct != self._last:
+                self._last = pct
+                self.progress_fn(pct)
+
+
+def _load_state(state_file, url, size):
+    try:
+        state = json.loads(Path(state_file).read_text())
+        if state.get("url") == url and state.get("size") == size:
+            return state
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def _save_state(state_file, state):
+    tmp = f"{state_file}.tmp"
+    Path(tmp).write_text(json.dumps(state))
+    os.replace(tmp, state_file)
+
+
+def _fetch_segment(http, url, part_file, segment, state, state_file, progress, lock, stop):
+    start, end, done = segment
+    if start + done > end:
+        return
+    headers = {"Range": f"bytes={start + done}-{end}"}
+    with http.get(url, headers=headers, stream=True, timeout=60) as r:
+        r.raise_for_status()
+        if r.status_code != 206:
+            raise IOError("server ignored the Range request")
+        with open(part_file, "r+b") as f:
+            f.seek(start + done)
+            for chunk in r.iter_content(chunk_size=CHUNK_SIZE):
+                if stop.is_set():
+                    return
+                if not chunk:
+                    continue
+                f.write(chunk)
+                with lock:
+                    segment[2] += len(chunk)
+                    _save_state(state_file, state)
+                progress.add(len(chunk))
+
+
+def _download_ranges(http, url, part_file, size, connections, progress, status_fn):
+    state_file = f"{part_file}.json"
+    state = _load_state(state_file, url, size) if os.path.exists(part_file) else None
+    if state is None:
+        count = max(1, min(connections, size // MIN_SEGMENT))
+        step = -(-size // count)
+        state = {"url": url, "size": size,
+                 "segments": [[i, min(i + step, size) - 1, 0] for i in range(0, size, step)]}
+        with open(part_file, "wb") as f:
+            f.truncate(size)
+        _save_state(state_file, state)
+    else:
+        resumed = sum(seg[2] for seg in state["segments"])
+        if status_fn: status_fn(f"⏯️ Resuming download ({resumed / 1e6:.0f} MB already on disk) ...")
+        progress.add(resumed)
+
+    lock = threading.Lock()
+    stop = threading.Event()
+    with ThreadPoolExecutor(max_workers=len(state["segments"])) as pool:
+        futures = [pool.submit(_fetch_segment, http, url, part_file, seg, state, state_file, progress, lock, stop)
+                   for seg in state["segments"]]
+        try:
+            for fut in futures:
+                fut.result()
+        except Exception:
+            stop.set()
+            raise
+    os.remove(state_file)
+
+
+def _download_single(http, url, part_file, ranges, progress):
+    offset = os.path.getsize(part_file) if (ranges and os.path.exists(part_file)) else 0
+    headers = {"Range": f"bytes={offset}-"} if offset else {}
+    with http.get(url, headers=headers, stream=True, timeout=60) as r:
+        r.raise_for_status()
+        if offset and r.status_code != 206:
+            offset = 0  # server sent the whole file, start over
+        progress.add(offset)
+        with open(part_file, "ab" if offset else "wb") as f:
+            for chunk in r.iter_content(chunk_size=CHUNK_SIZE):
+                if chunk:
+                    f.write(chunk)
+                    progress.add(len(chunk))
+
+
+def download_file(url, dest, connections=4, expected_size=None, sha256=None,
+                  status_fn=None, progress_fn=None, session=None):
+    """
+    Download `url` to `dest` safely: data goes to `dest.part`, interrupted downloads resume with
+    HTTP Range requests, large files are fetched over several connections, and the file is only
+    renamed into place once its size (and sha256, when known) check out.
+    """
+    http = session or requests.Session()
+    dest = Path(dest)
+    part_file = f"{dest}.part"
+    name = dest.name
+
+    try:
+        size, ranges, remote_sha = remote_file_info(url, session=http)
+    except Exception as e:
+        if status_fn: status_fn(f"❌ Could not reach {name}: {e}")
+        return False
+    size = expected_size or size
+    sha256 = (sha256 or remote_sha or "").lower() or None
+
+    progress = _Progress(size, progress_fn)
+    try:
+        if size and ranges and connections > 1:
+            _download_ranges(http, url, part_file, size, connections, progress, status_fn)
+        else:
+            _download_single(http, url, part_file, ranges, progress)
+    except Exception as e:
+        if status_fn: status_fn(f"❌ Download interrupted ({e}). Run again to resume.")
+        return False
+
+    if status_fn: status_fn(f"🔍 Verifying {name} ...")
+    actual_size = os.path.getsize(part_file)
+    if size and actual_size != size:
+        if status_fn: status_fn(f"❌ Size mismatch for {name}: expected {size} bytes, got {actual_size}.")
+        os.remove(part_file)
+        return False
+    if sha256 and sha256_of(part_file) != sha256:
+        if status_fn: status_fn(f"❌ Checksum mismatch for {name}; the partial file was removed.")
+        os.remove(part_file)
+        return False
+
+    os.replace(part_file, dest)
+    if progress_fn: progress_fn(100)
+    return True
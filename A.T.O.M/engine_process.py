@@ -0,0 +1,205 @@
+# A.T.O.M/engine_process.py
+import os
+import subprocess
+import sys
+import threading
+from multiprocessing.connection import Client, Listener
+
+import psutil
+
+from backends import BACKENDS, InferenceBackend
+from resources import tag_process, untag_process
+
+ENGINE_WORKER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "engine_worker.py")
+
+
+# ---------------- Supervisor (UI side) ---------------- #
+class EngineCrashed(RuntimeError):
+    pass
+
+
+class ProcessBackend(InferenceBackend):
+    """
+    Hosts the model in a separate process so native calls, GIL hand-offs and crashes stay out of the
+    Qt process. Tokens stream back over a pipe. If the engine process dies it is restarted (the model
+    reloads) and a request that hadn't produced any text yet is retried once.
+    The process runs engine_worker.py as its main module, so it never imports the UI.
+    """
+    name = "process"
+
+    def __init__(self, inner="ctransformers"):
+        super().__init__()
+        self.inner = inner
+        self._lock = threading.Lock()           # the generation connection
+        self._tokenize_lock = threading.Lock()  # the tokenize connection: never waits for a generation
+        self._proc = None
+        self._conn = None
+        self._tokenize_conn = None
+        self.restarts = 0
+
+    def load(self, model, context_length=4096, gpu_layers=0, threads=None, batch_size=None, model_type=None):
+        self._model = model
+        self._load_kwargs = {"context_length": context_length, "gpu_layers": gpu_layers,
+                             "threads": threads, "batch_size": batch_size, "model_type": model_type}
+        with self._lock:
+            self._start()
+        return self
+
+    def resident_bytes(self):
+        """RSS of the engine process (charged by model_pool instead of the file size if larger)."""
+        try:
+            return psutil.Process(self._proc.pid).memory_info().rss
+        except (AttributeError, psutil.Error):
+            return 0
+
+    def _start(self):
+        authkey = os.urandom(32)
+        with Listener(authkey=authkey) as listener:
+            self._proc = subprocess.Popen([sys.executable, ENGINE_WORKER, listener.address], stdin=subprocess.PIPE,
+                                          creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0))
+            self._proc.stdin.write(authkey.hex().encode("ascii") + b"\n")
+            self._proc.stdin.close()
+            tag_process("llm", self._proc.pid)
+            from thread_budget import pin_process  # UI side only
+            pin_process("llm", self._proc.pid)
+            self._conn = self._accept(listener, authkey)
+            self._tokenize_conn = self._accept(listener, authkey)
+        self._conn.send(("load", self.inner, str(self._model), self._load_kwargs))
+        reply = self._recv()
+        if reply[0] == "error":
+            self._proc.wait(timeout=5)
+            raise RuntimeError(f"Engine process failed to load the model: {reply[1]}")
+        self.context_length = reply[1]
+
+    def _accept(self, listener, authkey):
+        # accept() has no timeout: if the engine process dies before connecting, connect to
+        # ourselves to wake it up
+        accepted = {}
+
+        def accept():
+            try:
+                accepted["conn"] = listener.accept()
+            except Exception as e:
+                accepted["error"] = e
+
+        waiter = threading.Thread(target=accept, daemon=True)
+        waiter.start()
+        while waiter.is_alive():
+            waiter.join(0.5)
+            if waiter.is_alive() and self._proc.poll() is not None:
+                try:
+                    Client(listener.address, authkey=authkey).close()
+                except OSError:
+                    pass
+                waiter.join()
+                if "conn" in accepted:
+                    accepted["conn"].close()
+                raise EngineCrashed(f"engine process exited (code {self._proc.returncode})")
+        if "error" in accepted:
+            raise EngineCrashed(f"engine process didn't connect: {accepted['error']}")
+        return accepted["conn"]
+
+    def _recv(self, conn=None):
+        conn = conn or self._conn
+        while not conn.poll(0.5):
+            if self._proc.poll() is not None:
+                raise EngineCrashed(f"engine process exited (code {self._proc.returncode})")
+        try:
+            return conn.recv()
+        except (EOFError, OSError):
+            raise EngineCrashed("engine process closed the pipe")
+
+    def _close_conns(self):
+        for conn in (self._conn, self._tokenize_conn):
+            try:
+                if conn is not None:
+                    conn.close()
+            except OSError:
+                pass
+
+    def _restart(self):
+        self.restarts += 1
+        untag_process(self._proc.pid)
+        self._close_conns()
+        if self._proc.poll() is None:
+            self._proc.kill()
+        self._proc.wait()
+        self._start()
+
+    def stream(self, prompt, **kwargs):
+        with self._lock:
+            for attempt in (1, 2):
+                produced = False
+                try:
+                    self._conn.send(("generate", prompt, kwargs))
+                    while True:
+                        reply = self._recv()
+                        if reply[0] == "token":
+                            produced = True
+                            yield reply[1]
+                        elif reply[0] == "done":
+                            return
+                        else:
+                            raise RuntimeError(reply[1])
+                except (EngineCrashed, BrokenPipeError) as e:
+                    self._restart()
+                    if produced or attempt == 2:
+                        raise RuntimeError(f"Engine process crashed and was restarted: {e}")
+                except GeneratorExit:
+                    self._cancel()
+                    raise
+
+    def _cancel(self):
+        # stop the running generation and drain what it already sent
+        try:
+            self._conn.send(("cancel",))
+            while self._recv()[0] == "token":
+                pass
+        except (EngineCrashed, OSError):
+            self._restart()
+
+    def tokenize(self, text):
+        # separate connection, served by its own thread in the engine: doesn't queue behind generate
+        for attempt in (1, 2):
+            with self._tokenize_lock:
+                proc = self._proc
+                try:
+                    self._tokenize_conn.send(("tokenize", text))
+                    reply = self._recv(self._tokenize_conn)
+                except (EngineCrashed, OSError) as e:
+                    if attempt == 2:
+                        raise RuntimeError(f"Engine process crashed and was restarted: {e}")
+                    reply = None
+            if reply is None:
+                with self._lock:
+                    if self._proc is proc:  # not already restarted by a generation
+                        self._restart()
+                continue
+            if reply[0] == "error":
+                raise RuntimeError(reply[1])
+            return reply[1]
+
+    def close(self):
+        with self._lock:
+            if self._proc and self._proc.poll() is None:
+                try:
+                    self._conn.send(("stop",))
+                except OSError:
+                    pass
+                try:
+                    self._proc.wait(timeout=5)
+                except subprocess.TimeoutExpired:
+                    self._proc.kill()
+                    self._proc.wait()
+            if self._proc:
+                self._close_conns()
+                untag_process(self._proc.pid)
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+BACKENDS[ProcessBackend.name] = ProcessBackend
@@ -0,0 +1,75 @@
+# A.T.O.M/engine_worker.py
+"""
+Entry point of the engine process started by engine_process.ProcessBackend:
+
+    python engine_worker.py ADDRESS        (the connection's authkey is read from stdin, in hex)
+
+It connects back twice: one connection for generation and one for tokenize, which a separate
+thread serves so counting tokens (prompt building, the summarizer's chunker) never waits behind
+a running generation. Only backends.py is imported here, so the engine process never loads Qt,
+TTS or the rest of the UI.
+"""
+import sys
+import threading
+from multiprocessing.connection import Client
+
+from backends import create_backend
+
+
+def _serve_tokenize(conn, backend):
+    # tokenizing only reads the model's vocabulary, so it's safe next to a running generation
+    while True:
+        try:
+            msg = conn.recv()
+        except (EOFError, OSError):
+            return
+        try:
+            conn.send(("tokens", list(backend.tokenize(msg[1]))))
+        except Exception as e:
+            conn.send(("error", f"{type(e).__name__}: {e}"))
+
+
+def serve(conn, tokenize_conn):
+    """
+    Load the model with the requested backend, then serve requests from the pipe. Tokens are sent
+    back one message each; a ("cancel",) message stops the current generation.
+    """
+    _, inner, model, load_kwargs = conn.recv()  # ("load", inner backend, model, load kwargs)
+    try:
+        backend = create_backend(inner).load(model, **load_kwargs)
+    except Exception as e:
+        conn.send(("error", f"{type(e).__name__}: {e}"))
+        return
+    threading.Thread(target=_serve_tokenize, args=(tokenize_conn, backend), daemon=True).start()
+    conn.send(("ready", backend.context_length))
+
+    while True:
+        try:
+            msg = conn.recv()
+        except (EOFError, OSError):
+            return  # UI process went away
+        kind = msg[0]
+        if kind == "stop":
+            return
+        if kind == "generate":
+            _, prompt, kwargs = msg
+            try:
+                for token in backend.stream(prompt, **kwargs):
+                    if conn.poll() and conn.recv()[0] == "cancel":
+                        break
+                    conn.send(("token", token))
+                conn.send(("done",))
+            except Exception as e:
+                conn.send(("error", f"{type(e).__name__}: {e}"))
+
+
+def main():
+    address = sys.argv[1]
+    authkey = bytes.fromhex(sys.stdin.readline().strip())
+    conn = Client(address, authkey=authkey)
+    tokenize_conn = Client(address, authkey=authkey)
+    serve(conn, tokenize_conn)
+
+
+if __name__ == "__main__":
+    main()
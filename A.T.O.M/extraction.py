@@ -0,0 +1,271 @@
+# A.T.O.M/extraction.py
+"""
+Streaming text extraction for the documents A.T.O.M reads (summarizer, summarize command) and
+the file sorter ("file sort/File_sort.py").
+
+    for block in iter_text(path):   # PDF: one page at a time, DOCX / TXT: one paragraph at a time
+        ...
+
+Nothing is read ahead of the consumer, so memory stays flat on 1,000-page PDFs and a consumer
+that has seen enough (e.g. a keyword match) can simply stop iterating. PDFs go through the
+fastest installed backend: PyMuPDF, then PyPDF2. `python benchmark.py --extract DIR` compares
+the backends on a corpus.
+
+Large PDFs whose pages are slow to extract (scanned, image-heavy) continue on a process pool
+once a few pages have been timed: page ranges are handed to worker processes (each opens its own
+document handle) and the pages are yielded back in order, so consumers such as the summarizer's
+chunker don't notice the difference. The pool is started once and shared by every document.
+
+Only optional document libraries are imported here (lazily), so the file sorter can use this
+module without pulling in the Qt / LLM side of A.T.O.M.
+"""
+import atexit
+import importlib.util
+import multiprocessing
+import os
+import sys
+import threading
+import time
+import types
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+
+SUPPORTED_EXTENSIONS = (".txt", ".pdf", ".docx")
+PDF_BACKENDS = ("pymupdf", "pypdf2")  # fastest first
+_BACKEND_MODULES = {"pymupdf": ("pymupdf", "fitz"), "pypdf2": ("PyPDF2",)}  # fitz = PyMuPDF < 1.24.3
+TXT_BLOCK_CHARS = 64 * 1024  # a "paragraph" of a text file without blank lines is cut at this size
+PARALLEL_MIN_PAGES = 64      # smaller PDFs always stay serial
+SAMPLE_PAGES = 8             # pages timed (after the first, which includes opening) to estimate the cost
+PARALLEL_MIN_SECONDS = 3.0   # estimated serial time left that's worth the pool (starting it takes ~1 s)
+MIN_PAGES_PER_TASK = 16      # each task re-opens the document, so tasks shouldn't be tiny
+TASKS_PER_WORKER = 4         # enough tasks to even out slow (scanned, image-heavy) page ranges
+
+
+# ---------------- Backends ---------------- #
+def available_pdf_backends():
+    return [name for name in PDF_BACKENDS
+            if any(importlib.util.find_spec(module) is not None for module in _BACKEND_MODULES[name])]
+
+
+def pdf_backend(preferred=None):
+    """Name of the backend to use: `preferred` if it's installed, else the fastest installed one."""
+    available = available_pdf_backends()
+    if preferred in available:
+        return preferred
+    if not available:
+        raise RuntimeError("No PDF backend installed: pip install PyMuPDF (or PyPDF2)")
+    return available[0]
+
+
+def _pymupdf():
+    try:
+        import pymupdf
+    except ImportError:
+        import fitz as pymupdf
+    return pymupdf
+
+
+def _pymupdf_pages(path, start, stop):
+    with _pymupdf().open(path) as doc:
+        for number in range(start, doc.page_count if stop is None else min(stop, doc.page_count)):
+            yield doc.load_page(number).get_text("text")  # the page is freed once dropped
+
+
+def _pypdf2_pages(path, start, stop):
+    from PyPDF2 import PdfReader
+    with open(path, "rb") as f:
+        pages = PdfReader(f).pages
+        for number in range(start, len(pages) if stop is None else min(stop, len(pages))):
+            yield pages[number].extract_text() or ""
+
+
+_PAGE_READERS = {"pymupdf": _pymupdf_pages, "pypdf2": _pypdf2_pages}
+
+
+# ---------------- Per-format readers ---------------- #
+def page_count(path, backend=None):
+    backend = pdf_backend(backend)
+    if backend == "pymupdf":
+        with _pymupdf().open(path) as doc:
+            return doc.page_count
+    from PyPDF2 import PdfReader
+    with open(path, "rb") as f:
+        return len(PdfReader(f).pages)
+
+
+def iter_pdf_pages(path, backend=None, start=0, stop=None):
+    """Text of pages [start, stop) of a PDF, one page at a time."""
+    yield from _PAGE_READERS[pdf_backend(backend)](path, start, stop)
+
+
+def _extract_range(path, backend, start, stop):
+    # runs in a pool worker: its own document handle, one range of pages
+    return list(iter_pdf_pages(path, backend, start, stop))
+
+
+def default_workers():
+    return max(1, (os.cpu_count() or 1) - 1)  # leave a core for the UI / consumer
+
+
+_pool = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+@contextmanager
+def _bare_main():
+    # spawned workers re-import the parent's main script (UI_ATOM, File_sort or a sort UI, with
+    # their Qt / NLTK setup) unless __main__ looks like a bare interpreter while they start
+    main = sys.modules["__main__"]
+    sys.modules["__main__"] = types.ModuleType("__main__")
+    try:
+        yield
+    finally:
+        sys.modules["__main__"] = main
+
+
+def _executor(workers):
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers < workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            _pool_workers = workers
+        return _pool
+
+
+def shutdown_pool():
+    """Stop the shared extraction workers (also done at exit)."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+atexit.register(shutdown_pool)
+
+
+def iter_pdf_pages_parallel(path, backend=None, workers=None, pages=None, first=0):
+    """
+    Like iter_pdf_pages (from page `first` on), with page ranges extracted by the shared process
+    pool. Pages come back in order; only about two tasks per worker are in flight, so memory stays
+    bounded and closing the generator early cancels the rest.
+    """
+    backend = pdf_backend(backend)
+    pages = page_count(path, backend) if pages is None else pages
+    workers = workers or default_workers()
+    pages_per_task = max(MIN_PAGES_PER_TASK, -(-(pages - first) // (workers * TASKS_PER_WORKER)))
+    ranges = iter(range(first, pages, pages_per_task))
+    executor = _executor(workers)
+    in_flight = deque()
+
+    def submit(start):
+        with _bare_main():  # the pool may start a worker on any submit
+            in_flight.append(executor.submit(_extract_range, path, backend, start, start + pages_per_task))
+
+    try:
+        for start in ranges:
+            submit(start)
+            if len(in_flight) >= 2 * workers:
+                break
+        while in_flight:
+            texts = in_flight.popleft().result()
+            start = next(ranges, None)
+            if start is not None:
+                submit(start)
+            yield from texts
+    except BrokenProcessPool:
+        global _pool
+        with _pool_lock:
+            if _pool is executor:
+                _pool = None  # a worker died: start a fresh pool next time
+        raise
+    finally:
+        for future in in_flight:
+            future.cancel()
+
+
+def iter_pdf(path, backend=None, parallel=None, workers=None):
+    """
+    PDF pages in order. parallel=None: extract serially, and after timing the first pages move the
+    rest to the process pool if they would still take PARALLEL_MIN_SECONDS or more.
+    """
+    backend = pdf_backend(backend)
+    workers = workers or default_workers()
+    if parallel:
+        yield from iter_pdf_pages_parallel(path, backend, workers)
+        return
+    if parallel is False or workers < 2:
+        yield from iter_pdf_pages(path, backend)
+        return
+    pages = page_count(path, backend)
+    serial = iter_pdf_pages(path, backend)
+    try:
+        if pages < PARALLEL_MIN_PAGES:
+            yield from serial
+            return
+        done, spent = 0, 0.0
+        while done <= SAMPLE_PAGES:
+            started = time.perf_counter()
+            text = next(serial, None)
+            if done:  # the first page also pays for opening the document
+                spent += time.perf_counter() - started
+            if text is None:
+                return
+            done += 1
+            yield text
+        if spent / SAMPLE_PAGES * (pages - done) >= PARALLEL_MIN_SECONDS:
+            serial.close()
+            yield from iter_pdf_pages_parallel(path, backend, workers, pages=pages, first=done)
+        else:
+            yield from serial
+    finally:
+        serial.close()
+
+
+def iter_docx_paragraphs(path):
+    import docx  # python-docx parses the document XML up front; paragraphs are then yielded lazily
+    for paragraph in docx.Document(path).paragraphs:
+        yield paragraph.text
+
+
+def iter_txt_paragraphs(path, block_chars=TXT_BLOCK_CHARS):
+    """Blank-line separated paragraphs of a text file, read line by line."""
+    lines, size = [], 0
+    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+        for line in f:
+            if line.strip():
+                lines.append(line)
+                size += len(line)
+                if size < block_chars:
+                    continue
+            if lines:
+                yield "".join(lines).rstrip("\n")
+                lines, size = [], 0
+    if lines:
+        yield "".join(lines).rstrip("\n")
+
+
+def iter_text(path, backend=None, parallel=None):
+    """
+    Text of a .txt / .pdf / .docx file as a generator of blocks (pages for PDFs, paragraphs
+    otherwise). Blocks carry no trailing separator; join them with whatever the consumer needs.
+    parallel: see iter_pdf (None = automatic for large PDFs).
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".pdf":
+        return iter_pdf(path, backend, parallel)
+    if ext == ".docx":
+        return iter_docx_paragraphs(path)
+    if ext == ".txt":
+        return iter_txt_paragraphs(path)
+    raise ValueError(f"Unsupported file type '{ext}'. Please use .txt, .pdf, or .docx")
+
+
+def extract_text(path, sep="\n\n", backend=None, parallel=None):
+    """The whole text at once (joined in one pass, not by repeated concatenation)."""
+    return sep.join(iter_text(path, backend, parallel))
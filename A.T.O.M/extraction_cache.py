@@ -0,0 +1,181 @@
+# A.T.O.M/extraction_cache.py
+"""
+On-disk cache of extracted document text, shared by the summarizer and the file sorter.
+
+Entries are keyed by (absolute path, size, mtime_ns), so an unchanged file is never extracted
+twice. On a miss the file's SHA-256 is looked up as well, if an entry of the same size exists: a
+file that was moved (the sorter moves everything it categorizes) or touched without changes still
+hits. Files are only hashed when that lookup needs it or when their text is stored. Blocks
+(pages / paragraphs) are stored zlib-compressed in SQLite and evicted least-recently-used above
+`max_bytes`. Only PDF and DOCX text is cached: extracting a .txt is just reading it.
+
+Like extraction.py this has no Qt / LLM imports, so "file sort/File_sort.py" can use it.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+
+import extraction
+
+DEFAULT_CACHE_PATH = Path.home() / "A.T.O.M" / "cache" / "extraction.sqlite3"
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024  # compressed text, not counting SQLite overhead
+MAX_ENTRY_CHARS = 64 * 1024 * 1024     # documents with more text than this are streamed, not cached
+CACHED_EXTENSIONS = (".pdf", ".docx")  # formats whose extraction costs more than reading the cache
+
+
+def file_hash(path, block_size=1024 * 1024):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ExtractionCache:
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_bytes=DEFAULT_MAX_BYTES, use_hash=True):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.use_hash = use_hash
+        self._lock = threading.Lock()
+        self._db = None
+        self._stats = {"hits": 0, "hash_hits": 0, "misses": 0, "evictions": 0}
+
+    def _conn(self):
+        if self._db is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # the sorter and A.T.O.M may have the file open at the same time
+            self._db = sqlite3.connect(str(self.path), timeout=10, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")  # a lost entry only means re-extracting
+            self._db.execute("CREATE TABLE IF NOT EXISTS extractions ("
+                             "path TEXT PRIMARY KEY, size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL, "
+                             "sha256 TEXT, data BLOB NOT NULL, bytes INTEGER NOT NULL, last_used REAL NOT NULL)")
+            self._db.execute("CREATE INDEX IF NOT EXISTS extractions_sha256 ON extractions (sha256)")
+            self._db.execute("CREATE INDEX IF NOT EXISTS extractions_size ON extractions (size)")
+        return self._db
+
+    # ---------------- Lookup ---------------- #
+    def get(self, path):
+        """Cached blocks of `path` (list of str), or None. Moved / touched files are matched by hash."""
+        return self._lookup(os.path.abspath(path), os.stat(path))[0]
+
+    def _lookup(self, path, st):
+        # (blocks or None, the file's sha256 if it had to be computed)
+        with self._lock:
+            db = self._conn()
+            row = db.execute("SELECT data FROM extractions WHERE path = ? AND size = ? AND mtime_ns = ?",
+                             (path, st.st_size, st.st_mtime_ns)).fetchone()
+            if row:
+                db.execute("UPDATE extractions SET last_used = ? WHERE path = ?", (time.time(), path))
+                db.commit()
+                self._stats["hits"] += 1
+                return json.loads(zlib.decompress(row[0])), None
+            # a moved or touched copy has the same size: without one there's nothing to hash for
+            candidate = self.use_hash and db.execute("SELECT 1 FROM extractions WHERE size = ? LIMIT 1",
+                                                     (st.st_size,)).fetchone()
+            if not candidate:
+                self._stats["misses"] += 1
+                return None, None
+
+        digest = file_hash(path)
+        with self._lock:
+            db = self._conn()
+            row = db.execute("SELECT path, data FROM extractions WHERE sha256 = ? AND size = ? LIMIT 1",
+                             (digest, st.st_size)).fetchone()
+            if not row:
+                self._stats["misses"] += 1
+                return None, digest
+            old_path, data = row
+            if old_path == path or not os.path.exists(old_path):
+                db.execute("DELETE FROM extractions WHERE path = ? AND path != ?", (path, old_path))
+                db.execute("UPDATE extractions SET path = ?, mtime_ns = ?, last_used = ? WHERE path = ?",
+                           (path, st.st_mtime_ns, time.time(), old_path))  # moved: the entry follows it
+            else:
+                self._insert(db, path, st, digest, data)  # copied: both paths keep an entry
+            db.commit()
+            self._stats["hash_hits"] += 1
+        return json.loads(zlib.decompress(data)), digest
+
+    def put(self, path, blocks, st=None, digest=None):
+        """Store the blocks extracted from `path`; `st` is its os.stat() from *before* extracting."""
+        path = os.path.abspath(path)
+        st = st or os.stat(path)
+        if digest is None and self.use_hash:
+            digest = file_hash(path)
+        data = zlib.compress(json.dumps(blocks, ensure_ascii=False).encode("utf-8"))
+        with self._lock:
+            db = self._conn()
+            self._insert(db, path, st, digest, data)
+            self._evict(db)
+            db.commit()
+
+    def _insert(self, db, path, st, digest, data):
+        db.execute("INSERT OR REPLACE INTO extractions (path, size, mtime_ns, sha256, data, bytes, last_used) "
+                   "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                   (path, st.st_size, st.st_mtime_ns, digest, data, len(data), time.time()))
+
+    def _evict(self, db):
+        total = db.execute("SELECT COALESCE(SUM(bytes), 0) FROM extractions").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        victims = []
+        for path, size in db.execute("SELECT path, bytes FROM extractions ORDER BY last_used"):
+            if total <= self.max_bytes:
+                break
+            victims.append((path,))
+            total -= size
+        db.executemany("DELETE FROM extractions WHERE path = ?", victims)
+        self._stats["evictions"] += len(victims)
+
+    # ---------------- Extraction ---------------- #
+    def iter_text(self, path, backend=None, parallel=None):
+        """
+        extraction.iter_text through the cache: a hit yields the stored blocks, a miss streams the
+        extraction and stores it once the consumer has read the whole document.
+        """
+        if os.path.splitext(path)[1].lower() not in CACHED_EXTENSIONS:
+            yield from extraction.iter_text(path, backend, parallel)  # .txt, or raises ValueError
+            return
+        st = os.stat(path)  # taken first: a file changed while extracting is stored under the old key
+        blocks, digest = self._lookup(os.path.abspath(path), st)
+        if blocks is not None:
+            yield from blocks
+            return
+
+        blocks, chars = [], 0
+        for block in extraction.iter_text(path, backend, parallel):
+            if blocks is not None:
+                chars += len(block)
+                blocks.append(block)
+                if chars > MAX_ENTRY_CHARS:
+                    blocks = None
+            yield block
+        if blocks is not None:
+            self.put(path, blocks, st, digest)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            db = self._conn()
+            stats["entries"], stats["bytes"] = db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(bytes), 0) FROM extractions").fetchone()
+        return stats
+
+    def clear(self):
+        with self._lock:
+            db = self._conn()
+            db.execute("DELETE FROM extractions")
+            db.commit()
+
+
+cache = ExtractionCache()
+
+
+def iter_text(path, backend=None, parallel=None):
+    """Cached extraction.iter_text (module-level shared cache)."""
+    return cache.iter_text(path, backend, parallel)
@@ -0,0 +1,148 @@
+# A.T.O.M/llm_cache.py
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+DEFAULT_CACHE_PATH = Path.home() / "A.T.O.M" / "cache" / "responses.sqlite3"
+
+
+def make_key(model_file, prompt, max_tokens, temperature, top_p):
+    """Stable key for one generation request."""
+    raw = json.dumps([str(model_file), prompt, max_tokens, temperature, top_p], ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class _Flight:
+    """One generation in progress that identical requests can wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+
+
+class ResponseCache:
+    """
+    Two tier exact-match cache for LLM replies: an in-memory LRU in front of a SQLite file.
+    Identical requests made while one is already generating wait for it instead of generating again.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, memory_entries=256, disk_entries=5000):
+        self.path = Path(path) if path else None
+        self.memory_entries = memory_entries
+        self.disk_entries = disk_entries
+        self._memory = OrderedDict()
+        self._flights = {}
+        self._lock = threading.Lock()
+        self._db = None
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "coalesced": 0,
+                       "memory_evictions": 0, "disk_evictions": 0}
+
+    # ---------------- SQLite tier ---------------- #
+    def _conn(self):
+        if self._db is None and self.path:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+            self._db.execute("CREATE TABLE IF NOT EXISTS responses ("
+                             "key TEXT PRIMARY KEY, response TEXT NOT NULL, last_used REAL NOT NULL)")
+        return self._db
+
+    def _disk_get(self, key):
+        db = self._conn()
+        if db is None:
+            return None
+        row = db.execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+        if row:
+            db.execute("UPDATE responses SET last_used = ? WHERE key = ?", (time.time(), key))
+            db.commit()
+            return row[0]
+        return None
+
+    def _disk_put(self, key, response):
+        db = self._conn()
+        if db is None:
+            return
+        db.execute("INSERT OR REPLACE INTO responses (key, response, last_used) VALUES (?, ?, ?)",
+                   (key, response, time.time()))
+        count = db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        if count > self.disk_entries:
+            extra = count - self.disk_entries
+            db.execute("DELETE FROM responses WHERE key IN "
+                       "(SELECT key FROM responses ORDER BY last_used LIMIT ?)", (extra,))
+            self._stats["disk_evictions"] += extra
+        db.commit()
+
+    # ---------------- Memory tier ---------------- #
+    def _memory_put(self, key, response):
+        self._memory[key] = response
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+            self._stats["memory_evictions"] += 1
+
+    # ---------------- Public API ---------------- #
+    def get(self, key):
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self._stats["memory_hits"] += 1
+                return self._memory[key]
+            response = self._disk_get(key)
+            if response is not None:
+                self._memory_put(key, response)
+                self._stats["disk_hits"] += 1
+            return response
+
+    def put(self, key, response):
+        with self._lock:
+            self._memory_put(key, response)
+            self._disk_put(key, response)
+
+    def begin(self, key):
+        """
+        Look the key up and, on a miss, claim it.
+        Returns (cached_text, flight, is_leader). The leader must call finish(); followers wait on flight.
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                self._stats["coalesced"] += 1
+                return None, flight, False
+        cached = self.get(key)
+        if cached is not None:
+            return cached, None, False
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                self._stats["coalesced"] += 1
+                return None, flight, False
+            self._stats["misses"] += 1
+            flight = self._flights[key] = _Flight()
+            return None, flight, True
+
+    def finish(self, key, response):
+        """Store the leader's result (None = incomplete, not cached) and release the waiting requests."""
+        if response is not None:
+            self.put(key, response)
+        with self._lock:
+            flight = self._flights.pop(key, None)
+        if flight is not None:
+            flight.result = response
+            flight.done.set()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_entries"] = len(self._memory)
+        return stats
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            db = self._conn()
+            if db is not None:
+                db.execute("DELETE FROM responses")
+                db.commit()
@@ -1,16 +1,28 @@
 # A.T.O.M/local_engine.py
 import os
+import time
+import heapq
+import itertools
+import queue
+import threading
 from pathlib import Path
 from PyQt5.QtCore import QSettings
-from huggingface_hub import hf_hub_download, hf_hub_url
-import requests
-from ctransformers import AutoModelForCausalLM
-import torch
+import psutil
+from llm_cache import ResponseCache, make_key
+from autotune import load_tuning
+from model_pool import ModelPool
+from model_registry import ModelRegistry
+from backends import BACKENDS, create_backend
+from resources import tag_thread
+import power_profiles
+from thread_budget import pin_thread, thread_count, cores_for
+import engine_process  # registers the out-of-process "process" backend
 
 # ---------------- Model Download Settings  ---------------- #
 AVAILABLE_MODELS = {
     "Phi-3-mini-instruct": {
         "repo": "QuantFactory/Phi-3-mini-4k-instruct-GGUF",
+        "ollama": "phi3:mini",  # model tag used when the backend is "ollama"
         "quant": "Phi-3-mini-4k-instruct.Q4_K_M.gguf",
         # This can be either a folder OR a full file path. If it's a file path, the loader will use it directly.
         "model_path": r"F:\Experiments\A.T.O.M\models\Phi-3-mini-instruct\Phi-3-mini-4k-instruct.Q4_K_M.gguf",
@@ -18,11 +30,15 @@ AVAILABLE_MODELS = {
     "Phi-4-mini-instruct": {
         "repo": "QuantFactory/phi-4-GGUF",
         "quant": "Phi-4-mini-instruct-Q4_K_S.gguf",
+        "ollama": "phi4-mini",
         "model_path": None,
     },
 }
 
-llm_instance = None  # Global cached LLM instance
+_active_model = None  # model new requests go to; None = the saved model_choice
+model_ready = threading.Event()  # set once the startup model is loaded and warmed up (or failed to)
+model_registry = ModelRegistry()  # cached GGUF header metadata, see model_registry.py
+_save_dirs = {}  # model name -> custom download folder it was last looked up in (the splash's download_path)
 
 
 # ---------------- Helpers ---------------- #
@@ -33,9 +49,10 @@ def get_user_settings():
     return model_choice, model_path
 
 
-def download_model_hf(model_name: str, save_dir: str = None, status_fn=None, progress_fn=None):
+def download_model_hf(model_name: str, save_dir: str = None, status_fn=None, progress_fn=None, connections=4):
     """
     Download quantized model files from Hugging Face hub to a local folder.
+    Resumable and verified (see downloader.download_file); the .gguf only appears once complete.
     """
     info = AVAILABLE_MODELS.get(model_name)
     if not info:
@@ -49,6 +66,7 @@ def download_model_hf(model_name: str, save_dir: str = None, status_fn=None, pro
     base_dir.mkdir(parents=True, exist_ok=True)
 
     try:
+        from huggingface_hub import hf_hub_url
         url = hf_hub_url(repo_id, quant_file)
     except Exception as e:
         if status_fn:
@@ -58,81 +76,210 @@ def download_model_hf(model_name: str, save_dir: str = None, status_fn=None, pro
     local_file = base_dir / quant_file
     if status_fn: status_fn(f"📥 Downloading {quant_file} ...")
 
-    try:
-        with requests.get(url, stream=True) as r:
-            r.raise_for_status()
-            total = int(r.headers.get("content-length", 0))
-            downloaded = 0
-            chunk_size = 1024 * 1024
-            with open(local_file, "wb") as f:
-                for chunk in r.iter_content(chunk_size=chunk_size):
-                    if chunk:
-                        f.write(chunk)
-                        downloaded += len(chunk)
-                        if progress_fn and total > 0:
-                            progress = int(downloaded / total * 100)
-                            progress_fn(progress)
-
-        if status_fn: status_fn(f"✅ Download complete: {quant_file}")
-        if progress_fn:
-            progress_fn(100)
-        return True
-
-    except Exception as e:
-        if status_fn: status_fn(f"❌ Failed to download model: {e}")
+    from downloader import download_file
+    if not download_file(url, local_file, connections=connections, status_fn=status_fn, progress_fn=progress_fn):
+        if status_fn: status_fn(f"❌ Failed to download model: {quant_file}")
         return False
 
+    if status_fn: status_fn(f"✅ Download complete: {quant_file}")
+    return True
+
+
+def _model_folders(model_name: str, save_dir: str = None):
+    """
+    (explicit GGUF file or None, folders to search) for model_name, without touching the disk.
+    A save_dir given once is remembered, so reloads after an eviction and replica pools started
+    without one still search (and download into) the same folder.
+    """
+    if save_dir:
+        _save_dirs[model_name] = save_dir
+    else:
+        save_dir = _save_dirs.get(model_name)
+    info = AVAILABLE_MODELS.get(model_name) or {}
+    explicit, folders = None, []
+    model_path = info.get("model_path")
+    if model_path:
+        p = Path(os.path.abspath(model_path))
+        if p.suffix.lower() == ".gguf":
+            explicit = p
+            folders.append(p.parent)
+        else:
+            folders.append(p)
+    folders.append(Path(os.path.abspath(Path(save_dir or (Path.home() / "A.T.O.M" / "models")) / model_name)))
+    return explicit, folders
+
 
 def find_local_gguf(model_name: str, save_dir: str = None):
     """
     Return Path to a local GGUF file for model_name or None.
     Handles cases where AVAILABLE_MODELS[].model_path may be a file path or a folder.
+    The answer is remembered in model_registry, so repeat calls are a lookup plus one stat.
     """
-    info = AVAILABLE_MODELS.get(model_name)
-    if not info:
+    if model_name not in AVAILABLE_MODELS:
         return None
+    explicit, folders = _model_folders(model_name, save_dir)
+
+    remembered = model_registry.lookup(model_name)
+    if remembered and (remembered == explicit or remembered.parent in folders):
+        return remembered
 
     # If explicit model_path configured in AVAILABLE_MODELS, use it directly
-    model_path = info.get("model_path")
-    if model_path:
-        p = Path(model_path)
-        if p.is_file():
-            return p
-        # if it's a folder, search inside
-        if p.is_dir():
-            ggufs = list(p.glob("*.gguf"))
-            if ggufs:
-                return ggufs[0]
-
-    # fallback: look in default save_dir / model_name folder
-    base_dir = Path(save_dir or (Path.home() / "A.T.O.M" / "models")) / model_name
-    if not base_dir.exists():
+    if explicit and explicit.is_file():
+        model_registry.remember(model_name, explicit)
+        return explicit
+
+    # otherwise index the folders (headers are only parsed for new/changed files) and pick the
+    # configured quantization, else the first readable GGUF
+    entries = [e for e in model_registry.scan(folders) if "error" not in e]
+    if not entries:
         return None
-    ggufs = list(base_dir.glob("*.gguf"))
-    if ggufs:
-        return ggufs[0]
-    return None
+    quant = AVAILABLE_MODELS[model_name].get("quant")
+    chosen = next((e for e in entries if e["file_name"] == quant), entries[0])
+    model_registry.remember(model_name, chosen["path"])
+    return Path(chosen["path"])
+
+
+def list_local_ggufs(model_name: str, save_dir: str = None):
+    """Every local GGUF for model_name (e.g. several quantizations); find_local_gguf's pick comes first."""
+    first = find_local_gguf(model_name, save_dir=save_dir)
+    found = [first] if first else []
+    _, folders = _model_folders(model_name, save_dir)
+    found += [Path(e["path"]) for e in model_registry.scan(folders) if "error" not in e and Path(e["path"]) not in found]
+    return found
+
+
+def preferred_gguf(model_name: str, save_dir: str = None):
+    """
+    The GGUF the current power profile wants for model_name: its 'quant' ("smallest" or a name such
+    as "Q4_0") among the local files, else find_local_gguf's pick.
+    """
+    quant = power_profiles.current_profile()[1].get("quant")
+    if quant:
+        files = list_local_ggufs(model_name, save_dir=save_dir)
+        if quant == "smallest":
+            candidates = files
+        else:
+            candidates = [p for p in files if (model_registry.info(p).get("quantization") or "").upper() == quant.upper()]
+        if candidates:
+            return min(candidates, key=lambda p: model_registry.info(p)["size"])
+    return find_local_gguf(model_name, save_dir=save_dir)
+
+
+def installed_models():
+    """{model name: GGUF metadata} straight from the registry cache — instant, for the splash."""
+    return model_registry.installed()
+
+
+def _max_context():
+    """Upper bound for context_length ('max_context_length' in config); bigger contexts cost KV-cache RAM."""
+    return int(QSettings("A.T.O.M", "Config").value("max_context_length", 4096))
+
+
+# ---------------- Model Pool ---------------- #
+def _pool_budget_bytes():
+    """RAM the resident models may use: 'model_pool_budget_mb' in config, else half of physical RAM."""
+    budget_mb = QSettings("A.T.O.M", "Config").value("model_pool_budget_mb", None)
+    if budget_mb:
+        return int(budget_mb) * 1024 * 1024
+    return psutil.virtual_memory().total // 2
+
+
+model_pool = ModelPool(_pool_budget_bytes())
+
+
+# ---------------- Inference Backend ---------------- #
+def get_backend_name():
+    """
+    'ctransformers' (default), 'llama_cpp', 'ollama' or 'process' — the 'backend' key in config.
+    'process' runs the 'process_backend' backend (ctransformers by default) in a separate engine process.
+    """
+    return QSettings("A.T.O.M", "Config").value("backend", "ctransformers")
+
+
+def set_backend(name: str, status_fn=None):
+    """Switch backends; resident models are dropped and reload through the new backend on next use."""
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown backend '{name}'. Choose one of: {', '.join(BACKENDS)}")
+    QSettings("A.T.O.M", "Config").setValue("backend", name)
+    for model_name in model_pool.loaded():
+        model_pool.evict(model_name)
+    if status_fn: status_fn(f"🔌 Inference backend: {name}")
+
+
+def _new_backend():
+    name = get_backend_name()
+    if name == "ollama":
+        url = QSettings("A.T.O.M", "Config").value("ollama_url", None)
+        return create_backend(name, base_url=url)
+    if name == "process":
+        inner = QSettings("A.T.O.M", "Config").value("process_backend", "ctransformers")
+        return create_backend(name, inner=inner)
+    return create_backend(name)
+
+
+def get_active_model():
+    return _active_model or get_user_settings()[0]
+
+
+def set_active_model(model_name: str, status_fn=None):
+    """
+    Hot-swap the model new requests go to. Requests already queued or generating keep the model
+    they were submitted with; the old model stays resident until the pool needs the memory.
+    """
+    global _active_model
+    if model_name not in AVAILABLE_MODELS:
+        raise ValueError(f"Model '{model_name}' not in AVAILABLE_MODELS")
+    _active_model = model_name
+    QSettings("A.T.O.M", "Config").setValue("model_choice", model_name)
+    if status_fn: status_fn(f"🔀 Active model: {model_name}")
 
 
 # ---------------- Load Model ---------------- #
 def load_model(model_name: str = None, save_dir: str = None, status_fn=None, device: str = None):
     """
-    Load the GGUF model using ctransformers.AutoModelForCausalLM.
+    Load the model with the configured backend (ctransformers by default, see backends.py).
     device: None (auto), 'cpu' or 'cuda' to force.
+    model_name: None = the active model. Already resident models are returned from the pool.
     """
-    global llm_instance
-    if llm_instance is not None:
+    model_name = model_name or get_active_model()
+    if model_name in model_pool.loaded():
         if status_fn: status_fn("✅ Model already loaded (cached).")
-        return llm_instance
+    return model_pool.get(model_name, _loader(model_name, save_dir, status_fn, device), status_fn=status_fn,
+                          estimate=_estimate(model_name, save_dir))
+
+
+def _loader(model_name, save_dir=None, status_fn=None, device=None):
+    return lambda: _load_model(model_name, save_dir=save_dir, status_fn=status_fn, device=device)
 
-    model_choice, custom_path = get_user_settings()
-    model_name = model_name or model_choice
+
+def _estimate(model_name, save_dir=None):
+    """Bytes model_pool makes room for before loading: the GGUF _load_model will pick (0 if remote / not downloaded)."""
+    def estimate():
+        if not BACKENDS[get_backend_name()].uses_local_file:
+            return 0
+        local_file = preferred_gguf(model_name, save_dir=save_dir or _save_dirs.get(model_name))
+        return os.path.getsize(local_file) if local_file else 0
+    return estimate
+
+
+def _load_model(model_name: str, save_dir: str = None, status_fn=None, device: str = None):
+    """Load model_name from disk; returns (model, gguf_path). Called by model_pool on a miss."""
     info = AVAILABLE_MODELS.get(model_name)
     if not info:
         raise ValueError(f"Model '{model_name}' not in AVAILABLE_MODELS")
 
-    # locate local GGUF file (handles file or folder)
-    local_file = find_local_gguf(model_name, save_dir=save_dir)
+    backend = _new_backend()
+    if not backend.uses_local_file:
+        # weights are served elsewhere (Ollama daemon): nothing to find or download here
+        tag = info.get("ollama") or model_name
+        if status_fn: status_fn(f"🔌 Connecting to {backend.name} model '{tag}' ...")
+        model = backend.load(tag, context_length=_max_context())
+        if status_fn: status_fn(f"✅ Model ready ({model_name}) via {backend.name}.")
+        return model, None
+
+    # locate local GGUF file (handles file or folder; the power profile may prefer a smaller quant)
+    save_dir = save_dir or _save_dirs.get(model_name)
+    local_file = preferred_gguf(model_name, save_dir=save_dir)
     if not local_file:
         if status_fn: status_fn("⚠️ Model not found locally — attempting to download...")
         success = download_model_hf(model_name, save_dir=save_dir, status_fn=status_fn)
@@ -142,12 +289,30 @@ def load_model(model_name: str = None, save_dir: str = None, status_fn=None, dev
         if not local_file:
             raise RuntimeError(f"❌ Model still not found after download attempt: {model_name}")
 
+    return load_gguf(local_file, status_fn=status_fn, device=device, label=model_name), local_file
+
+
+def _cuda_available():
+    # torch is only needed for this check, so it's imported here rather than at startup
+    try:
+        import torch
+    except ImportError:
+        return False
+    return torch.cuda.is_available()
+
+
+def load_gguf(local_file, status_fn=None, device: str = None, label: str = None):
+    """
+    Load one specific GGUF file with the configured backend (GPU first when available, CPU fallback).
+    Not cached and not kept anywhere: model_pool holds the only reference, so eviction frees it.
+    """
+    label = label or Path(local_file).name
     if status_fn: status_fn(f"📦 Loading model from '{local_file}' ...")
 
     # Decide device: prefer CPU if user forced 'cpu' or torch reports no GPU or device override
     if device is None:
-        device = "cuda" if torch.cuda.is_available() else "cpu"
-    if device == "cuda" and not torch.cuda.is_available():
+        device = "cuda" if _cuda_available() else "cpu"
+    if device == "cuda" and not _cuda_available():
         device = "cpu"
 
     safe_gpu_layers = 0
@@ -161,31 +326,42 @@ def load_model(model_name: str = None, save_dir: str = None, status_fn=None, dev
     else:
         safe_gpu_layers = 0
 
+    # model_type and context length come from the GGUF header (cached in model_registry)
+    params = model_registry.loader_params(local_file, max_context=_max_context())
+
+    # threads / batch_size measured by autotune.py for this GGUF (ctransformers defaults if never tuned)
+    # capped by the LLM's share of the cores (thread_budget.py) so TTS / ASR keep theirs
+    tuned = {"threads": thread_count("llm")}
+    tuning = load_tuning(local_file)
+    if tuning:
+        tuned = {"threads": min(tuning["threads"], tuned["threads"]), "batch_size": tuning["batch_size"]}
+        if status_fn: status_fn(f"⚙️ Using tuned settings: threads={tuned['threads']} batch_size={tuned['batch_size']}")
+
     # Try loading with GPU (if requested) and if that fails, fallback to CPU
     try:
-        llm_instance = AutoModelForCausalLM.from_pretrained(
-        str(local_file),
-        model_type="phi",
+        model = _new_backend().load(
+        local_file,
         gpu_layers=safe_gpu_layers,
-        context_length=4096,    # 4096 allow longer responses (prevents truncation max phi3 quant can handle)
+        **params,
+        **tuned,
         )
-        if status_fn: status_fn(f"✅ Model loaded successfully ({model_name}) on device={device} gpu_layers={safe_gpu_layers}")
-        return llm_instance
+        if status_fn: status_fn(f"✅ Model loaded successfully ({label}) on device={device} gpu_layers={safe_gpu_layers}")
+        return model
 
     except Exception as e_gpu:
         # GPU load failed — FALLBACK to CPU
         if status_fn:
             status_fn(f"⚠️ Loading on GPU failed: {e_gpu}. Retrying on CPU (gpu_layers=0)...")
         try:
-            llm_instance = AutoModelForCausalLM.from_pretrained(
-            str(local_file),
-            model_type="phi",
+            model = _new_backend().load(
+            local_file,
             gpu_layers=0,
-            context_length=4096,     # also for CPU fallback
+            **params,                # also for CPU fallback
+            **tuned,
         )
             if status_fn:
-                status_fn(f"✅ Model loaded successfully ({model_name}) on CPU (gpu_layers=0).")
-            return llm_instance
+                status_fn(f"✅ Model loaded successfully ({label}) on CPU (gpu_layers=0).")
+            return model
         except Exception as e_cpu:
             # both attempts failed — raise with both traces
             raise RuntimeError(f"Failed loading model on GPU and CPU.\nGPU error: {e_gpu}\nCPU error: {e_cpu}")
@@ -202,6 +378,7 @@ def set_manual_model_path(model_name: str, folder_path: str, status_fn=None):
         if status_fn: status_fn(f"❌ No .gguf files found in '{folder_path}'.")
         return False
 
+    model_registry.scan([folder])  # index the headers now so the first load is a lookup
     if model_name in AVAILABLE_MODELS:
         AVAILABLE_MODELS[model_name]["model_path"] = str(folder)
     else:
@@ -219,18 +396,350 @@ def set_manual_model_path(model_name: str, folder_path: str, status_fn=None):
     return True
 
 
+# ---------------- Model replicas ---------------- #
+def open_replica_pool(model_name: str = None, replicas: int = None, status_fn=None):
+    """
+    Start several engine processes on the same GGUF for parallel batch work (see replica_pool.py).
+    replicas: None = as many as the LLM cores and free RAM allow ('max_replicas' in config caps it).
+    Returns None when that would be fewer than two, or the backend doesn't load local files.
+    """
+    from replica_pool import ReplicaPool, plan_replicas
+
+    settings = QSettings("A.T.O.M", "Config")
+    inner = get_backend_name()
+    if inner == "process":
+        inner = settings.value("process_backend", "ctransformers")
+    if not BACKENDS[inner].uses_local_file:
+        return None
+    model_name = model_name or get_active_model()
+    local_file = preferred_gguf(model_name)
+    if not local_file:
+        return None
+
+    cores = len(cores_for("llm"))
+    max_replicas = int(settings.value("max_replicas", 0)) or None
+    n = replicas or plan_replicas(local_file, cores, max_replicas=max_replicas)
+    if n < 2:
+        return None
+    params = model_registry.loader_params(local_file, max_context=_max_context())
+    tuning = load_tuning(local_file)
+    if tuning:
+        params["batch_size"] = tuning["batch_size"]
+    if status_fn: status_fn(f"🧬 Starting {n} model replicas ({max(1, cores // n)} threads each) ...")
+    return ReplicaPool(local_file, n, max(1, cores // n), inner=inner, **params)
+
+
+# ---------------- Power profiles ---------------- #
+def _on_power_profile(name, profile):
+    """
+    Swap resident models to the GGUF the new profile prefers. Evicted models reload on their next
+    request; one that is generating right now finishes on the old weights first (see ModelPool).
+    Pool entries that aren't AVAILABLE_MODELS names (e.g. benchmark.py's) are never touched, and
+    a model stays loaded when no other local file is preferred.
+    """
+    print(f"🔋 Power profile: {name}")
+    if get_backend_name() == "ollama":
+        return
+    for model_name in model_pool.loaded():
+        if model_name not in AVAILABLE_MODELS:
+            continue
+        loaded_file = model_pool.model_file(model_name)
+        preferred = preferred_gguf(model_name)
+        if loaded_file and preferred and preferred.is_file() and Path(loaded_file) != preferred:
+            model_pool.evict(model_name)
+
+
+power_profiles.manager.add_listener(_on_power_profile)
+
+
+# ---------------- Inference Scheduler ---------------- #
+# The ctransformers model is not thread-safe, so every generation goes through one worker
+# thread that owns it. Lower number = served first.
+PRIORITY_INTERACTIVE = 0   # terminal chat, voice replies
+PRIORITY_BATCH = 10        # document summarization and other background work
+
+_DONE = object()  # end-of-stream marker on a request's output queue
+
+
+class CancelToken:
+    """Shared flag a caller sets to stop a queued or running generation."""
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+
+class InferenceRequest:
+    def __init__(self, prompt, gen_kwargs, priority, cancel_token, device, model_name):
+        self.model_name = model_name
+        self.prompt = prompt
+        self.gen_kwargs = gen_kwargs
+        self.priority = priority
+        self.cancel_token = cancel_token or CancelToken()
+        self.device = device
+        self.output = queue.Queue()
+
+    def tokens(self):
+        """Yield generated text as it arrives. Abandoning the iterator cancels the request."""
+        finished = False
+        try:
+            while True:
+                item = self.output.get()
+                if item is _DONE:
+                    finished = True
+                    return
+                if isinstance(item, Exception):
+                    finished = True
+                    raise item
+                yield item
+        finally:
+            if not finished:
+                self.cancel_token.cancel()
+
+
+class InferenceScheduler:
+    """
+    Serializes model calls through a priority queue served by a single worker thread.
+    A batch request that is generating when interactive work arrives is preempted: it goes back
+    in the queue and later resumes from the text it had already produced.
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._worker = None
+        self._current = None
+
+    def submit(self, prompt, priority=PRIORITY_INTERACTIVE, cancel_token=None, device=None, model_name=None,
+               **gen_kwargs):
+        # the model is fixed at submit time, so a hot-swap doesn't move requests already queued
+        request = InferenceRequest(prompt, gen_kwargs, priority, cancel_token, device,
+                                   model_name or get_active_model())
+        with self._cond:
+            heapq.heappush(self._heap, (priority, next(self._seq), request))
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="atom-inference", daemon=True)
+                self._worker.start()
+            self._cond.notify()
+        return request
+
+    def cancel_all(self):
+        """Cancel every queued request and the one currently generating (e.g. on window close)."""
+        with self._cond:
+            for _, _, request in self._heap:
+                request.cancel_token.cancel()
+            if self._current is not None:
+                self._current.cancel_token.cancel()
+
+    def _should_yield(self, request):
+        with self._cond:
+            return bool(self._heap) and self._heap[0][0] < request.priority
+
+    def _run(self):
+        tag_thread("llm")
+        pin_thread("llm")  # ggml's compute threads are spawned from here and inherit the LLM cores
+        while True:
+            with self._cond:
+                while not self._heap:
+                    self._cond.wait()
+                _, _, request = heapq.heappop(self._heap)
+                self._current = request
+            try:
+                if request.cancel_token.cancelled:
+                    request.output.put(_DONE)
+                else:
+                    self._generate(request)
+            finally:
+                with self._cond:
+                    self._current = None
+
+    def _generate(self, request):
+        kwargs = dict(request.gen_kwargs)
+        # read between requests; a profile change never affects a generation already running
+        threads = power_profiles.current_profile()[1].get("threads")
+        if threads and "threads" not in kwargs:
+            kwargs["threads"] = min(threads, thread_count("llm"))
+        produced = []
+        try:
+            with model_pool.acquire(request.model_name, _loader(request.model_name, device=request.device),
+                                    estimate=_estimate(request.model_name)) as model:
+                for token in model(request.prompt, stream=True, **kwargs):
+                    if request.cancel_token.cancelled:
+                        break
+                    produced.append(token)
+                    request.output.put(token)
+                    if self._should_yield(request):
+                        # resume later by continuing the prompt with what was already generated
+                        request.prompt += "".join(produced)
+                        remaining = kwargs.get("max_new_tokens", 1024) - len(produced)
+                        if remaining > 0:
+                            request.gen_kwargs["max_new_tokens"] = remaining
+                            with self._cond:
+                                heapq.heappush(self._heap, (request.priority, next(self._seq), request))
+                            return
+                        break
+        except Exception as e:
+            request.output.put(RuntimeError(f"Error during model generate: {e}"))
+            return
+        request.output.put(_DONE)
+
+
+scheduler = InferenceScheduler()
+response_cache = ResponseCache()
+
+
+def cache_stats():
+    """Hit / miss / eviction counters of the response cache."""
+    return response_cache.stats()
+
+
+def response_cache_mode():
+    """
+    'response_cache' in config: 'off', 'deterministic' (default: temperature 0 requests, and callers
+    that pass cache=True) or 'always' (every request, sampled replies included).
+    """
+    return QSettings("A.T.O.M", "Config").value("response_cache", "deterministic")
+
+
+def _model_file(model_name):
+    if get_backend_name() == "ollama":
+        return f"ollama:{(AVAILABLE_MODELS.get(model_name) or {}).get('ollama') or model_name}"
+    return model_pool.model_file(model_name) or preferred_gguf(model_name)  # the file load_model would pick
+
+
+def model_id(model_name: str = None):
+    """Stable identity of the weights behind model_name (GGUF name + size, or the Ollama tag) for caches."""
+    model_file = _model_file(model_name or get_active_model())
+    if model_file and not str(model_file).startswith("ollama:") and os.path.exists(model_file):
+        return f"{Path(model_file).name}:{os.path.getsize(model_file)}"
+    return str(model_file)
+
+
 # ---------------- Generate Response ---------------- #
-def get_response_from_atom(prompt, max_tokens=1024, temperature=0.7, top_p=0.9, device: str = None):
+def get_response_from_atom(prompt, max_tokens=1024, temperature=0.7, top_p=0.9, device: str = None,
+                           priority=PRIORITY_INTERACTIVE, cancel_token: CancelToken = None, cache=None,
+                           model_name: str = None):
     """
     Generate text using the loaded model. Provide `device='cpu'` to force CPU inference for testing.
+    Returns whatever was generated so far if `cancel_token` is cancelled.
+    model_name: route to a specific AVAILABLE_MODELS entry instead of the active one.
+    """
+    return "".join(stream_response_from_atom(prompt, max_tokens=max_tokens, temperature=temperature, top_p=top_p,
+                                             device=device, priority=priority, cancel_token=cancel_token,
+                                             cache=cache, model_name=model_name))
+
+
+def stream_response_from_atom(prompt, max_tokens=1024, temperature=0.7, top_p=0.9, device: str = None,
+                              priority=PRIORITY_INTERACTIVE, cancel_token: CancelToken = None, cache=None,
+                              model_name: str = None):
+    """
+    Same as get_response_from_atom but yields the text piece by piece as the model produces it,
+    so the UI can show (and TTS can speak) the answer before generation has finished.
+    cache: None = as response_cache_mode() says, True = cache even when sampling (unless the mode is
+    'off'), False = never. A cached reply is yielded as a single piece.
     """
-    model = load_model(device=device)
-    # ctransformers models are callable; calling returns a string
+    model_name = model_name or get_active_model()
+    profile_cap = power_profiles.current_profile()[1].get("max_tokens")
+    if profile_cap:
+        max_tokens = min(max_tokens, profile_cap)  # before the cache key, so short replies aren't reused later
+
+    def submit():
+        return scheduler.submit(prompt, priority=priority, cancel_token=cancel_token, device=device,
+                                model_name=model_name, max_new_tokens=max_tokens, temperature=temperature,
+                                top_p=top_p)
+
+    mode = response_cache_mode()
+    if mode == "off" or cache is False:
+        use_cache = False
+    else:
+        use_cache = cache or mode == "always" or temperature == 0
+    if not use_cache:
+        yield from submit().tokens()
+        return
+
+    key = make_key(_model_file(model_name), prompt, max_tokens, temperature, top_p)
+    cached, flight, leader = response_cache.begin(key)
+    if cached is not None:
+        yield cached
+        return
+
+    if not leader:
+        # same prompt is already generating: wait for it instead of running it twice
+        while not flight.done.wait(0.1):
+            if cancel_token and cancel_token.cancelled:
+                return
+        if flight.result is not None:
+            yield flight.result
+            return
+        yield from submit().tokens()  # the other request was cancelled, generate our own
+        return
+
+    produced = []
+    complete = False
     try:
-        return model(prompt, max_new_tokens=max_tokens, temperature=temperature, top_p=top_p)
-    except Exception as e:
-        # If model call fails, raise a clearer error
-        raise RuntimeError(f"Error during model generate: {e}")
+        request = submit()
+        for token in request.tokens():
+            produced.append(token)
+            yield token
+        complete = not request.cancel_token.cancelled
+    finally:
+        response_cache.finish(key, "".join(produced) if complete else None)
+
+
+# ---------------- Warm-up ---------------- #
+WARMUP_PROMPT = "Hi"
+
+
+def prefault_model_file(path, block_size=8 * 1024 * 1024):
+    """Read the GGUF once so its pages are in the OS cache before the model mmaps it."""
+    with open(path, "rb") as f:
+        if hasattr(os, "posix_fadvise"):
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        buf = bytearray(block_size)
+        view = memoryview(buf)
+        while f.readinto(view):
+            pass
+
+
+def warm_up_model(model_name: str = None, save_dir: str = None, status_fn=None, device: str = None):
+    """
+    Startup path used by the splash: page the weights in, load the model, then run two tiny
+    generations so the first real prompt doesn't pay for cold page faults and first-call setup.
+    Reports cold vs warm timings through status_fn. Always sets `model_ready` when done.
+    """
+    model_name = model_name or get_active_model()
+    try:
+        timings = {}
+        local_file = preferred_gguf(model_name, save_dir=save_dir) if get_backend_name() != "ollama" else None
+        if local_file and model_name not in model_pool.loaded():
+            if status_fn: status_fn("📀 Paging model weights into memory ...")
+            start = time.perf_counter()
+            prefault_model_file(local_file)
+            timings["page-in"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        load_model(model_name, save_dir=save_dir, status_fn=status_fn, device=device)
+        timings["load"] = time.perf_counter() - start
+
+        if status_fn: status_fn("🔥 Warming up model ...")
+        for label in ("cold prompt", "warm prompt"):
+            start = time.perf_counter()
+            get_response_from_atom(WARMUP_PROMPT, max_tokens=1, temperature=0, cache=False,
+                                   model_name=model_name, device=device)
+            timings[label] = time.perf_counter() - start
+
+        if status_fn:
+            status_fn("✅ Model hot: " + ", ".join(f"{k} {v:.2f}s" for k, v in timings.items()))
+        return timings
+    finally:
+        model_ready.set()
 
 
 # ------------- quick test helper (FOR TESTING ONLY) -------------- #
@@ -245,3 +754,10 @@ def test_model(prompt="Hello, test!", device="cpu"):
     except Exception as e:
         print("Test failed:", e)
         return False
+
+
+# ------------- micro-benchmark (see benchmark.py) -------------- #
+def benchmark_models(fake=False, out_path=None, status_fn=print):
+    """Time-to-first-token, tokens/sec, prompt-eval, load time and peak RSS per model; JSON report."""
+    from benchmark import run_benchmark
+    return run_benchmark(fake=fake, out_path=out_path, status_fn=status_fn)
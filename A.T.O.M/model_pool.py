@@ -0,0 +1,116 @@
+# A.T.O.M/model_pool.py
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+
+class _Entry:
+    def __init__(self, model, model_file, size):
+        self.model = model
+        self.model_file = model_file
+        self.size = size      # bytes charged against the budget
+        self.in_use = 0       # generations currently running on it
+        self.evicted = False  # dropped from the pool, freed once in_use reaches 0
+
+
+class ModelPool:
+    """
+    Keeps several loaded models resident (keyed by AVAILABLE_MODELS name) within a RAM budget.
+    Least recently used models are evicted first; a model that is still generating is only
+    released after its in-flight requests finish.
+    """
+
+    def __init__(self, budget_bytes):
+        self.budget_bytes = budget_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+        self._load_lock = threading.Lock()  # one load at a time, and never the same model twice
+
+    def used_bytes(self):
+        with self._lock:
+            return sum(e.size for e in self._entries.values())
+
+    def loaded(self):
+        with self._lock:
+            return list(self._entries)
+
+    def model_file(self, name):
+        with self._lock:
+            entry = self._entries.get(name)
+            return entry.model_file if entry else None
+
+    def get(self, name, loader, status_fn=None, estimate=None):
+        """
+        Return the resident model `name`, loading it with `loader()` -> (model, model_file) if needed.
+        Before a load, least recently used models are unloaded to make room for `estimate()` bytes
+        (the size of the file about to be loaded), so the pool never holds both; after it, again
+        until the pool is back within budget in case the estimate was short.
+        """
+        model = self._lookup(name)
+        if model is not None:
+            return model
+
+        with self._load_lock:
+            model = self._lookup(name)
+            if model is not None:
+                return model
+            if estimate is not None:
+                with self._lock:
+                    self._evict(keep=None, incoming=estimate(), status_fn=status_fn)
+            model, model_file = loader()
+            # charged by file size: the mmap'd weights are what stays resident, and a process-wide RSS
+            # delta would also bill whatever other threads (TTS preload, warm-up) allocated meanwhile.
+            # model_file is None for remote backends, whose weights don't live in this process; an
+            # engine process is charged its own RSS if that is larger.
+            size = os.path.getsize(model_file) if model_file else 0
+            if hasattr(model, "resident_bytes"):
+                size = max(size, model.resident_bytes())
+
+            with self._lock:
+                self._entries[name] = _Entry(model, str(model_file) if model_file else None, size)
+                self._evict(keep=name, status_fn=status_fn)
+        return model
+
+    def _lookup(self, name):
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None:
+                return None
+            self._entries.move_to_end(name)
+            return entry.model
+
+    @contextmanager
+    def acquire(self, name, loader, status_fn=None, estimate=None):
+        """Hold a model for the duration of a generation so eviction waits for it."""
+        while True:
+            self.get(name, loader, status_fn=status_fn, estimate=estimate)
+            with self._lock:
+                entry = self._entries.get(name)
+                if entry is not None:  # not evicted between loading and now
+                    entry.in_use += 1
+                    break
+        try:
+            yield entry.model
+        finally:
+            with self._lock:
+                entry.in_use -= 1
+                if entry.evicted and entry.in_use == 0:
+                    entry.model = None
+
+    def evict(self, name):
+        with self._lock:
+            entry = self._entries.pop(name, None)
+            if entry is not None:
+                entry.evicted = True
+                if entry.in_use == 0:
+                    entry.model = None
+
+    def _evict(self, keep, incoming=0, status_fn=None):
+        for name in list(self._entries):
+            if self.used_bytes() + incoming <= self.budget_bytes:
+                break
+            if name == keep:
+                continue
+            if status_fn: status_fn(f"♻️ Unloading '{name}' to stay within the model memory budget.")
+            self.evict(name)
@@ -0,0 +1,233 @@
+# A.T.O.M/model_registry.py
+import json
+import os
+import struct
+import threading
+from pathlib import Path
+
+DEFAULT_REGISTRY_PATH = Path.home() / "A.T.O.M" / "cache" / "models.json"
+
+# ---------------- GGUF header ---------------- #
+# https://github.com/ggerganov/ggml/blob/master/docs/gguf.md
+GGUF_MAGIC = b"GGUF"
+_SCALARS = {0: "<B", 1: "<b", 2: "<H", 3: "<h", 4: "<I", 5: "<i", 6: "<f", 7: "<?", 10: "<Q", 11: "<q", 12: "<d"}
+_STRING, _ARRAY = 8, 9
+
+# general.file_type -> quantization name (llama.cpp's llama_ftype)
+FILE_TYPES = {
+    0: "F32", 1: "F16", 2: "Q4_0", 3: "Q4_1", 7: "Q8_0", 8: "Q5_0", 9: "Q5_1", 10: "Q2_K",
+    11: "Q3_K_S", 12: "Q3_K_M", 13: "Q3_K_L", 14: "Q4_K_S", 15: "Q4_K_M", 16: "Q5_K_S",
+    17: "Q5_K_M", 18: "Q6_K", 19: "IQ2_XXS", 20: "IQ2_XS", 21: "Q2_K_S", 22: "IQ3_XS",
+    23: "IQ3_XXS", 24: "IQ1_S", 25: "IQ4_NL", 26: "IQ3_S", 27: "IQ3_M", 28: "IQ2_S",
+    29: "IQ2_M", 30: "IQ4_XS", 31: "IQ1_M", 32: "BF16",
+}
+
+# GGUF architecture -> ctransformers model_type
+MODEL_TYPES = {
+    "phi2": "phi", "phi3": "phi", "llama": "llama", "mistral": "mistral", "falcon": "falcon",
+    "mpt": "mpt", "gpt2": "gpt2", "gptj": "gptj", "gptneox": "gpt_neox", "starcoder": "starcoder",
+}
+
+
+class _Reader:
+    def __init__(self, f, version):
+        self.f = f
+        self.count_fmt = "<I" if version == 1 else "<Q"  # v1 used 32-bit lengths and counts
+
+    def unpack(self, fmt):
+        size = struct.calcsize(fmt)
+        data = self.f.read(size)
+        if len(data) != size:
+            raise ValueError("truncated GGUF header")
+        return struct.unpack(fmt, data)[0]
+
+    def count(self):
+        return self.unpack(self.count_fmt)
+
+    def string(self):
+        return self.f.read(self.count()).decode("utf-8", errors="replace")
+
+    def value(self, vtype):
+        if vtype in _SCALARS:
+            return self.unpack(_SCALARS[vtype])
+        if vtype == _STRING:
+            return self.string()
+        if vtype == _ARRAY:
+            self.skip_array()
+            return None
+        raise ValueError(f"unknown GGUF value type {vtype}")
+
+    def skip_array(self):
+        # arrays are the tokenizer vocab etc. — skipped with seeks, never decoded
+        item_type = self.unpack("<I")
+        n = self.count()
+        if item_type in _SCALARS:
+            self.f.seek(n * struct.calcsize(_SCALARS[item_type]), os.SEEK_CUR)
+        elif item_type == _STRING:
+            for _ in range(n):
+                self.f.seek(self.count(), os.SEEK_CUR)
+        elif item_type == _ARRAY:
+            for _ in range(n):
+                self.skip_array()
+        else:
+            raise ValueError(f"unknown GGUF array type {item_type}")
+
+
+def read_gguf_header(path):
+    """
+    Parse the metadata of a GGUF file without touching the tensor data.
+    Returns {'architecture', 'name', 'context_length', 'quantization', 'tensor_count', 'gguf_version'}.
+    """
+    with open(path, "rb", buffering=64 * 1024) as f:
+        if f.read(4) != GGUF_MAGIC:
+            raise ValueError(f"{path} is not a GGUF file")
+        version = struct.unpack("<I", f.read(4))[0]
+        reader = _Reader(f, version)
+        tensor_count = reader.count()
+        kv_count = reader.count()
+        metadata = {}
+        for _ in range(kv_count):
+            key = reader.string()
+            metadata[key] = reader.value(reader.unpack("<I"))
+
+    arch = metadata.get("general.architecture")
+    file_type = metadata.get("general.file_type")
+    return {
+        "architecture": arch,
+        "name": metadata.get("general.name"),
+        "context_length": metadata.get(f"{arch}.context_length"),
+        "quantization": FILE_TYPES.get(file_type, _quant_from_filename(path)),
+        "tensor_count": tensor_count,
+        "gguf_version": version,
+    }
+
+
+def _quant_from_filename(path):
+    # e.g. Phi-3-mini-4k-instruct.Q4_K_M.gguf -> Q4_K_M
+    stem = Path(path).stem.upper().replace("-", ".").split(".")
+    for part in reversed(stem):
+        if part[:1] in ("Q", "F", "I") and any(c.isdigit() for c in part):
+            return part
+    return None
+
+
+# ---------------- Registry ---------------- #
+class ModelRegistry:
+    """
+    Persistent index of the GGUF files A.T.O.M knows about. Each file's header is parsed once and
+    cached with its size and mtime, so later lookups only stat the file (or not even that, for
+    `installed()`). Also remembers which GGUF each model name resolved to.
+    """
+
+    def __init__(self, path=DEFAULT_REGISTRY_PATH):
+        self.path = Path(path) if path else None
+        self._lock = threading.RLock()
+        self._files = {}    # absolute path -> header info + size + mtime_ns
+        self._models = {}   # model name -> absolute path of its chosen GGUF
+        self._load()
+
+    # ---------------- Persistence ---------------- #
+    def _load(self):
+        if not self.path or not self.path.exists():
+            return
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            self._files = data.get("files", {})
+            self._models = data.get("models", {})
+        except (OSError, ValueError):
+            pass  # unreadable registry = rebuild from disk
+
+    def save(self):
+        if not self.path:
+            return
+        with self._lock:
+            data = json.dumps({"files": self._files, "models": self._models}, indent=1)
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+            tmp.write_text(data, encoding="utf-8")
+            os.replace(tmp, self.path)
+        except OSError:
+            pass
+
+    # ---------------- File metadata ---------------- #
+    def info(self, gguf_path, save=True):
+        """Header metadata for one GGUF; parsed only when the file is new or its size/mtime changed."""
+        key = os.path.abspath(gguf_path)
+        st = os.stat(key)
+        with self._lock:
+            cached = self._files.get(key)
+            if cached and cached["size"] == st.st_size and cached["mtime_ns"] == st.st_mtime_ns:
+                return cached
+        try:
+            entry = read_gguf_header(key)
+        except (OSError, ValueError, struct.error) as e:
+            entry = {"error": str(e), "quantization": _quant_from_filename(key)}
+        entry.update(path=key, file_name=Path(key).name, size=st.st_size, mtime_ns=st.st_mtime_ns)
+        with self._lock:
+            self._files[key] = entry
+        if save:
+            self.save()
+        return entry
+
+    def scan(self, folders):
+        """Index every *.gguf in the given folders; returns their entries. Unchanged files aren't re-read."""
+        entries = []
+        for folder in folders:
+            folder = Path(folder)
+            if not folder.is_dir():
+                continue
+            for p in sorted(folder.glob("*.gguf")):
+                try:
+                    entries.append(self.info(p, save=False))
+                except OSError:
+                    continue
+        self.save()
+        return entries
+
+    def forget_missing(self):
+        with self._lock:
+            for key in [k for k in self._files if not os.path.exists(k)]:
+                del self._files[key]
+            self._models = {m: p for m, p in self._models.items() if p in self._files}
+        self.save()
+
+    # ---------------- Model names ---------------- #
+    def lookup(self, model_name):
+        """The remembered GGUF for model_name if it's still there unchanged, else None."""
+        with self._lock:
+            key = self._models.get(model_name)
+            cached = self._files.get(key) if key else None
+        if not cached:
+            return None
+        try:
+            st = os.stat(key)
+        except OSError:
+            return None
+        if cached["size"] != st.st_size or cached["mtime_ns"] != st.st_mtime_ns:
+            return None
+        return Path(key)
+
+    def remember(self, model_name, gguf_path):
+        with self._lock:
+            self._models[model_name] = os.path.abspath(gguf_path)
+        self.save()
+
+    def installed(self):
+        """{model name: cached entry} from the registry alone — no disk access, for the splash."""
+        with self._lock:
+            return {m: dict(self._files[p]) for m, p in self._models.items() if p in self._files}
+
+    # ---------------- Loader parameters ---------------- #
+    def loader_params(self, gguf_path, max_context=4096):
+        """
+        Backend load arguments derived from the header: ctransformers model_type from the
+        architecture and the trained context length, capped at max_context (KV cache memory).
+        """
+        entry = self.info(gguf_path)
+        arch = entry.get("architecture")
+        trained = entry.get("context_length") or max_context
+        return {
+            "model_type": MODEL_TYPES.get(arch, arch or "phi"),
+            "context_length": min(int(trained), int(max_context)),
+        }
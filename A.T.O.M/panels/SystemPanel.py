@@ -8,6 +8,7 @@ import psutil
 import datetime
 from panels.circles import CircularProgress
 from panels.cpugraph import Waveform
+from resources import monitor, LABELS
 
 font = QFont("Orbitron")
 
@@ -111,6 +112,14 @@ class SystemPanel(QWidget):
         self.cpu_circle.setValue(int(psutil.cpu_percent()))
         self.ram_circle.setValue(int(psutil.virtual_memory().percent))
 
+        # A.T.O.M's own share, per subsystem (hover the CPU circle; full table: "atom resources")
+        monitor.sample()
+        usage = monitor.usage()
+        self.cpu_container.setToolTip("\n".join(
+            f"{LABELS.get(name, name)}: {u['cpu_percent']:.0f}%"
+            for name, u in usage.items() if u["cpu_percent"] is not None and u["threads"]
+        ))
+
     # ---------------- Update Battery Value & SVG ---------------- #
     def update_battery_status(self):
         battery = psutil.sensors_battery()
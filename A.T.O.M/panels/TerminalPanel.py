@@ -1,20 +1,21 @@
 import os
 import re
 import html
+import itertools
 import threading
-from PyPDF2 import PdfReader
-from docx import Document
 
 from PyQt5.QtCore import Qt, QEvent, pyqtSignal, pyqtSlot, QThread, QObject, QPropertyAnimation, QEasingCurve
-from PyQt5.QtGui import QFont, QTextCursor, QTextOption, QColor
+from PyQt5.QtGui import QFont, QTextCursor, QTextOption, QColor, QTextCharFormat
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QTextEdit, QPushButton, QFileDialog,
     QGraphicsDropShadowEffect, QHBoxLayout
 )
 
 from command import handle_command
-from tts_atom import speak_response
-from local_engine import get_response_from_atom
+from tts_atom import speak_response, speak_stream
+from local_engine import CancelToken
+from conversation import ConversationSession
+import summarizer
 
 
 # ================================================================= #
@@ -24,44 +25,40 @@ class SummarizerWorker(QObject):
     progress = pyqtSignal(str)
     finished = pyqtSignal(str)
     error = pyqtSignal(str)
+    done = pyqtSignal()  # always emitted last (success, error or cancel): ends the thread
 
     def __init__(self, file_path):
         super().__init__()
         self.file_path = file_path
+        self.cancel_token = CancelToken()
+
+    def cancel(self):
+        """Thread-safe: stops the running LLM call and the remaining chunks."""
+        self.cancel_token.cancel()
 
     @pyqtSlot()
     def run(self):
         try:
             ext = os.path.splitext(self.file_path)[1].lower()
-            text = ""
-
-            if ext == ".txt":
-                with open(self.file_path, "r", encoding="utf-8", errors="ignore") as f:
-                    text = f.read()
-            elif ext == ".pdf":
-                reader = PdfReader(self.file_path)
-                for page in reader.pages:
-                    text += page.extract_text() or ""
-            elif ext == ".docx":
-                doc = Document(self.file_path)
-                for para in doc.paragraphs:
-                    text += para.text + "\n"
-            else:
+            if ext not in summarizer.SUPPORTED_EXTENSIONS:
                 self.error.emit("⚠️ Unsupported file type.")
                 return
 
-            if not text.strip():
+            self.progress.emit("🔹 Summarizing document...")
+            summary = summarizer.summarize_file(self.file_path, progress_fn=self.progress.emit,
+                                                cancel_token=self.cancel_token)
+            if not summary:
                 self.error.emit("⚠️ No readable text found in the document.")
                 return
 
-            self.progress.emit("🔹 Summarizing document...")
-            prompt = f"Summarize this text concisely:\n\n{text}"
-            summary = get_response_from_atom(prompt)
-
             self.finished.emit(summary)
 
+        except summarizer.SummaryCancelled:
+            self.error.emit("🛑 Summarization cancelled.")
         except Exception as e:
             self.error.emit(f"⚠️ Error summarizing file: {e}")
+        finally:
+            self.done.emit()
 
 
 # ================================================================= #
@@ -90,12 +87,45 @@ class SummarizerMixin:
         worker.finished.connect(self.on_summary_finished)
 
         thread.started.connect(worker.run)
-        worker.finished.connect(thread.quit)
-        worker.finished.connect(worker.deleteLater)
-        thread.finished.connect(thread.deleteLater)
+        worker.done.connect(thread.quit)
+        worker.done.connect(worker.deleteLater)
+        thread.finished.connect(self._summary_ended)  # queued to the GUI thread; deletes the thread
 
+        self._summaries.append((thread, worker))
+        self.cancelDocButton.show()
         thread.start()
 
+    def cancel_summaries(self):
+        for _, worker in self._summaries:
+            worker.cancel()
+        if self._summaries:
+            self.message_signal.emit("🛑 Cancelling summarization...")
+
+    def stop_summaries(self):
+        """
+        Cancel running summaries and wait until their threads have finished (window closing):
+        a QThread destroyed while it still runs aborts the app. Cancelling ends the running LLM
+        call at its next token, so the wait is short.
+        """
+        for _, worker in self._summaries:
+            worker.cancel()
+        for thread, _ in self._summaries:
+            thread.quit()  # takes effect once the worker's run() returns
+            thread.wait()
+        self._summaries = []
+
+    @pyqtSlot()
+    def _summary_ended(self):
+        running = []
+        for thread, worker in self._summaries:
+            if thread.isFinished():
+                thread.deleteLater()
+            else:
+                running.append((thread, worker))
+        self._summaries = running
+        if not running:
+            self.cancelDocButton.hide()
+
     @pyqtSlot(str)
     def on_summary_finished(self, summary):
         self.message_signal.emit(f"\n🧠 Summary:\n{summary}\n")
@@ -107,10 +137,18 @@ class SummarizerMixin:
 # ================================================================= #
 class TerminalChat(QWidget, SummarizerMixin):
     message_signal = pyqtSignal(str)
+    # streamed LLM replies: start -> token* -> finished(full text), all tagged with the stream's id
+    stream_started = pyqtSignal(int)
+    token_signal = pyqtSignal(int, str)
+    stream_finished = pyqtSignal(int, str)
 
     def __init__(self):
         super().__init__()
         self.voice_mode = False
+        self._streams = {}  # stream id -> (start cursor, end cursor) of its text in the output
+        self._stream_ids = itertools.count()
+        self.session = ConversationSession()  # chat history shared with voice mode
+        self._summaries = []  # running (QThread, SummarizerWorker) pairs
 
         layout = QVBoxLayout(self)
 
@@ -159,6 +197,25 @@ class TerminalChat(QWidget, SummarizerMixin):
         glow_anim.setLoopCount(-1)
         glow_anim.start()
 
+        self.cancelDocButton = QPushButton("✖", self)
+        self.cancelDocButton.setToolTip("Cancel document summarization")
+        self.cancelDocButton.setFixedSize(36, 36)
+        self.cancelDocButton.setStyleSheet("""
+            QPushButton {
+                color: rgb(255,110,110);
+                font-size: 16px;
+                font-weight: bold;
+                background-color: rgba(0, 0, 0, 0.1);
+                border: 1px solid rgb(255,110,110);
+                border-radius: 8px;
+            }
+            QPushButton:hover {
+                background-color: rgba(255, 110, 110, 0.3);
+            }
+        """)
+        self.cancelDocButton.clicked.connect(self.cancel_summaries)
+        self.cancelDocButton.hide()  # only while a summary is running
+
         self.input = QTextEdit()
         self.input.setFixedHeight(50)
         self.input.setPlaceholderText("Type your message here and press Enter...")
@@ -167,6 +224,7 @@ class TerminalChat(QWidget, SummarizerMixin):
         self.input.setLineWrapMode(QTextEdit.WidgetWidth)
 
         input_row.addWidget(self.addDocButton)
+        input_row.addWidget(self.cancelDocButton)
         input_row.addWidget(self.input)
         layout.addLayout(input_row)
 
@@ -174,6 +232,9 @@ class TerminalChat(QWidget, SummarizerMixin):
 
         # Thread-safe GUI updates
         self.message_signal.connect(self.append_message)
+        self.stream_started.connect(self.begin_atom_stream)
+        self.token_signal.connect(self.append_stream_token)
+        self.stream_finished.connect(self.end_atom_stream)
 
     # ---------------- Event Filter ---------------- #
     def eventFilter(self, source, event):
@@ -190,6 +251,63 @@ class TerminalChat(QWidget, SummarizerMixin):
         self.output.insertHtml(html_fragment + "<br>\n")
         self.output.moveCursor(QTextCursor.End)
 
+    # ---------------- Streamed reply (tokens appended in place) ---------------- #
+    # Each stream owns the range between its two cursors. A block is inserted after that range, so
+    # messages (and other streams) appended while it runs go below it and are never touched by it.
+    @pyqtSlot(int)
+    def begin_atom_stream(self, stream_id: int):
+        document = self.output.document()
+        start = QTextCursor(document)
+        start.movePosition(QTextCursor.End)
+        start.setKeepPositionOnInsert(True)
+        cursor = QTextCursor(start)
+        cursor.setKeepPositionOnInsert(False)
+        cursor.insertHtml("<span style='color:#00ffc3;'><b>A.T.O.M:</b></span><br>")
+        cursor.insertBlock()
+        end = QTextCursor(document)  # tokens are inserted here, just before that block
+        end.setPosition(cursor.position() - 1)
+        self._streams[stream_id] = (start, end)
+        self.output.moveCursor(QTextCursor.End)
+
+    @pyqtSlot(int, str)
+    def append_stream_token(self, stream_id: int, token: str):
+        stream = self._streams.get(stream_id)
+        if stream is None:
+            return
+        fmt = QTextCharFormat()
+        fmt.setForeground(QColor("#00ffc3"))
+        stream[1].insertText(token, fmt)  # the end cursor moves past its own insertion
+        self.output.ensureCursorVisible()
+
+    @pyqtSlot(int, str)
+    def end_atom_stream(self, stream_id: int, full_text: str):
+        """Swap this stream's raw text for the formatted (code highlighted) message, in place."""
+        stream = self._streams.pop(stream_id, None)
+        if stream is None:
+            return
+        start, end = stream
+        cursor = QTextCursor(self.output.document())
+        cursor.setPosition(start.position())
+        cursor.setPosition(end.position() + 1, QTextCursor.KeepAnchor)  # + the block inserted after it
+        cursor.removeSelectedText()
+        if full_text.strip():
+            cursor.insertHtml(self._atom_html(full_text) + "<br>\n")
+
+    def stream_atom_reply(self, tokens, speak=False):
+        """Consume a token iterator (from any thread), showing it live. Returns the full reply."""
+        if speak:
+            tokens = speak_stream(tokens)
+        reply = ""
+        stream_id = next(self._stream_ids)
+        self.stream_started.emit(stream_id)
+        try:
+            for token in tokens:
+                reply += token
+                self.token_signal.emit(stream_id, token)
+        finally:
+            self.stream_finished.emit(stream_id, reply)
+        return reply
+
     # ---------------- Send message ---------------- #
     def send_message(self):
         user_input = self.input.toPlainText().strip()
@@ -215,10 +333,7 @@ class TerminalChat(QWidget, SummarizerMixin):
                 return
 
             try:
-                reply = get_response_from_atom(user_input)
-                self.display_atom_message(reply)
-                if self.voice_mode:
-                    speak_response(reply)
+                self.stream_atom_reply(self.session.stream_reply(user_input), speak=self.voice_mode)
             except Exception as e:
                 self.message_signal.emit(f"<div style='color:red;'>⚠️ Error: {e}</div>")
 
@@ -226,14 +341,16 @@ class TerminalChat(QWidget, SummarizerMixin):
 
     # ---------------- Display Atom message ---------------- #
     def display_atom_message(self, text):
+        self.message_signal.emit(self._atom_html(text))
+
+    def _atom_html(self, text):
         formatted = self._format_response(text)
-        atom_html = (
+        return (
             f"<div style='text-align:left; margin:6px;'>"
             f"<span style='color:#00ffc3; padding:6px 10px; border-radius:12px; "
             f"display:inline-block; max-width:65%; vertical-align:top;'>"
             f"<b>A.T.O.M:</b><br>{formatted}</span></div>"
         )
-        self.message_signal.emit(atom_html)
 
     # ---------------- Format response with code highlighting ---------------- #
     def _format_response(self, raw_text: str) -> str:
@@ -0,0 +1,137 @@
+# A.T.O.M/power_profiles.py
+"""
+Battery- and thermal-aware inference profiles.
+
+    full     plugged in: tuned threads, requested max_tokens, configured quantization, TTS effects
+    battery  on battery: fewer threads, shorter replies, smallest local quantization, no TTS effects
+    hot      CPU above 'thermal_limit_c': like battery, a bit stricter
+
+Profiles live in config as JSON under 'power_profiles' (merged over the defaults below), and
+'power_profile' forces one by name ('auto' = pick from the power state). The scheduler asks for the
+current profile before each request, so switches never happen mid-generation.
+"""
+import json
+import threading
+import time
+
+import psutil
+from PyQt5.QtCore import QSettings
+
+CHECK_INTERVAL = 10.0   # seconds between battery / sensor reads
+THERMAL_HYSTERESIS = 5  # °C below the limit before leaving "hot"
+
+
+def _default_profiles():
+    physical = psutil.cpu_count(logical=False) or 2
+    return {
+        # None = leave the value alone (autotuned threads, caller's max_tokens, configured quant file)
+        "full": {"threads": None, "max_tokens": None, "quant": None, "tts_effects": True},
+        "battery": {"threads": max(1, physical // 2), "max_tokens": 384, "quant": "smallest", "tts_effects": False},
+        "hot": {"threads": max(1, physical // 3), "max_tokens": 256, "quant": "smallest", "tts_effects": False},
+    }
+
+
+def _settings():
+    return QSettings("A.T.O.M", "Config")
+
+
+def load_profiles():
+    profiles = _default_profiles()
+    raw = _settings().value("power_profiles", None)
+    if raw:
+        try:
+            for name, values in json.loads(raw).items():
+                profiles[name] = dict(profiles.get(name, profiles["full"]), **values)
+        except (ValueError, AttributeError):
+            pass
+    return profiles
+
+
+def save_profiles(profiles):
+    _settings().setValue("power_profiles", json.dumps(profiles))
+
+
+# ---------------- Sensors ---------------- #
+def on_battery():
+    try:
+        battery = psutil.sensors_battery()
+    except Exception:
+        return False
+    return bool(battery) and battery.power_plugged is False
+
+
+def cpu_temperature():
+    """Hottest CPU sensor reading in °C, or None where psutil can't read sensors (e.g. Windows)."""
+    read = getattr(psutil, "sensors_temperatures", None)
+    if read is None:
+        return None
+    try:
+        sensors = read()
+    except Exception:
+        return None
+    readings = [t.current for name, entries in sensors.items()
+                if name in ("coretemp", "k10temp", "zenpower", "cpu_thermal", "acpitz")
+                for t in entries if t.current]
+    return max(readings) if readings else None
+
+
+# ---------------- Profile selection ---------------- #
+class ProfileManager:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._name = None
+        self._checked = 0.0
+        self._listeners = []
+
+    def add_listener(self, fn):
+        """fn(name, profile) is called whenever the active profile changes (not when it's first detected)."""
+        self._listeners.append(fn)
+
+    def _detect(self):
+        settings = _settings()
+        forced = settings.value("power_profile", "auto")
+        if forced != "auto":
+            return forced
+        limit = float(settings.value("thermal_limit_c", 85))
+        temp = cpu_temperature()
+        if temp is not None:
+            if temp >= limit or (self._name == "hot" and temp > limit - THERMAL_HYSTERESIS):
+                return "hot"
+        return "battery" if on_battery() else "full"
+
+    def current(self):
+        """(name, profile) — sensors are re-read at most every CHECK_INTERVAL seconds."""
+        changed = False
+        with self._lock:
+            now = time.monotonic()
+            if self._name is None or now - self._checked >= CHECK_INTERVAL:
+                self._checked = now
+                name = self._detect()
+                changed = self._name is not None and name != self._name
+                self._name = name
+            name = self._name
+        profiles = load_profiles()
+        profile = profiles.get(name, profiles["full"])
+        if changed:
+            for fn in self._listeners:
+                try:
+                    fn(name, profile)
+                except Exception:
+                    pass
+        return name, profile
+
+    def refresh(self):
+        """Re-read the sensors on the next current() call (e.g. after changing the config)."""
+        with self._lock:
+            self._checked = 0.0
+
+
+manager = ProfileManager()
+
+
+def current_profile():
+    return manager.current()
+
+
+def tts_effects_enabled():
+    return bool(manager.current()[1].get("tts_effects", True))
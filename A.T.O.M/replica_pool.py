@@ -0,0 +1,130 @@
+# A.T.O.M/replica_pool.py
+import os
+import queue
+import threading
+
+import psutil
+
+from engine_process import ProcessBackend
+
+# Memory a replica needs besides the weights (KV cache for the context, scratch buffers).
+# The weights themselves are mmap'd from the GGUF, so every replica shares the same page-cache pages.
+REPLICA_OVERHEAD_FRACTION = 0.25
+REPLICA_OVERHEAD_MIN = 512 * 1024 * 1024
+MIN_THREADS_PER_REPLICA = 2
+
+
+def plan_replicas(model_file, cores, max_replicas=None):
+    """
+    How many replicas to run: limited by the cores (at least MIN_THREADS_PER_REPLICA each) and by
+    the RAM that's free after the shared weights, so replicas never push the machine into swap.
+    """
+    size = os.path.getsize(model_file)
+    per_replica = max(REPLICA_OVERHEAD_MIN, int(size * REPLICA_OVERHEAD_FRACTION))
+    headroom = psutil.virtual_memory().available - size  # weights counted once: shared pages
+    by_ram = max(1, headroom // per_replica)
+    by_cores = max(1, cores // MIN_THREADS_PER_REPLICA)
+    n = min(by_ram, by_cores)
+    if max_replicas:
+        n = min(n, max_replicas)
+    return int(n)
+
+
+class ReplicaPool:
+    """
+    N copies of one model, each in its own engine process (see engine_process.py), for throughput
+    work like the summarizer's map phase. Prompts are handed to whichever replica is free; results
+    come back in input order.
+    """
+
+    def __init__(self, model_file, replicas, threads_per_replica, inner="ctransformers", **load_kwargs):
+        self.replicas = []
+        errors = []
+
+        def start():
+            try:
+                backend = ProcessBackend(inner=inner).load(model_file, threads=threads_per_replica, **load_kwargs)
+                self.replicas.append(backend)
+            except Exception as e:
+                errors.append(e)
+
+        # load in parallel: after the first one the weights are already in the page cache
+        loaders = [threading.Thread(target=start, daemon=True) for _ in range(replicas)]
+        for t in loaders:
+            t.start()
+        for t in loaders:
+            t.join()
+        if not self.replicas:
+            raise RuntimeError(f"No model replica could be started: {errors[0] if errors else 'unknown error'}")
+
+    def __len__(self):
+        return len(self.replicas)
+
+    def map(self, prompts, progress_fn=None, cancel_token=None, **gen_kwargs):
+        """
+        Generate a reply for every prompt in `prompts` (any iterable, consumed lazily) and return
+        the replies in the same order. progress_fn(done, submitted) is called as replies finish.
+        Cancelling `cancel_token` stops the running generations; the replies are then partial.
+        """
+        work = queue.Queue(maxsize=2 * len(self.replicas))  # bounded: the input is read as it's needed
+        results = {}
+        errors = []
+        lock = threading.Lock()
+        counts = {"submitted": 0, "done": 0}
+
+        def serve(replica):
+            while True:
+                item = work.get()
+                if item is None:
+                    return
+                index, prompt = item
+                reply = ""
+                try:
+                    if not errors:
+                        tokens = replica.stream(prompt, **gen_kwargs)
+                        try:
+                            for token in tokens:
+                                if cancel_token is not None and cancel_token.cancelled:
+                                    break
+                                reply += token
+                        finally:
+                            tokens.close()  # stops a cancelled generation in the engine process
+                except Exception as e:
+                    errors.append(e)
+                    reply = ""
+                with lock:
+                    results[index] = reply
+                    counts["done"] += 1
+                    done, submitted = counts["done"], counts["submitted"]
+                if progress_fn:
+                    progress_fn(done, submitted)
+
+        workers = [threading.Thread(target=serve, args=(r,), daemon=True) for r in self.replicas]
+        for t in workers:
+            t.start()
+        try:
+            for index, prompt in enumerate(prompts):
+                if errors or (cancel_token is not None and cancel_token.cancelled):
+                    break
+                with lock:
+                    counts["submitted"] += 1
+                work.put((index, prompt))
+        finally:
+            for _ in workers:
+                work.put(None)
+            for t in workers:
+                t.join()
+        if errors:
+            raise RuntimeError(f"Replica generation failed: {errors[0]}")
+        return [results[i] for i in range(len(results))]
+
+    def close(self):
+        for replica in self.replicas:
+            replica.close()
+        self.replicas = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,192 @@
+# A.T.O.M/resources.py
+"""
+Per-subsystem resource accounting: CPU time, CPU %, threads and memory of A.T.O.M's own parts
+(LLM engine, TTS, speech listener, UI thread, summarizer) instead of whole-machine totals.
+
+Threads say which subsystem they work for with `with subsystem("tts"):` (or `tag_thread`), and
+helper processes such as the out-of-process engine are registered with `tag_process`. CPU time is
+read per OS thread from psutil, so no timing code runs in the hot paths.
+
+Native worker threads (ggml's compute threads, torch's intra-op pool) are never tagged, but they
+inherit the cores their creating thread was pinned to (thread_budget.py). Untagged threads whose
+affinity lies inside one subsystem's cores are charged to that subsystem (Linux; elsewhere, or
+with pinning off, they stay under "other").
+"""
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+import psutil
+
+SUBSYSTEMS = ("llm", "tts", "asr", "ui", "summarizer")
+LABELS = {"llm": "LLM engine", "tts": "TTS", "asr": "Speech listener", "ui": "UI thread",
+          "summarizer": "Summarizer", "other": "Other"}
+
+_lock = threading.Lock()
+_threads = {}    # native thread id -> subsystem
+_processes = {}  # pid -> subsystem (child processes, e.g. the engine process)
+
+
+# ---------------- Tagging ---------------- #
+def tag_thread(name):
+    """Attribute the calling thread to subsystem `name`; returns the previous tag (or None)."""
+    tid = threading.get_native_id()
+    with _lock:
+        previous = _threads.get(tid)
+        _threads[tid] = name
+    return previous
+
+
+def untag_thread():
+    with _lock:
+        _threads.pop(threading.get_native_id(), None)
+
+
+@contextmanager
+def subsystem(name):
+    """Attribute the calling thread to `name` for the duration of the block."""
+    previous = tag_thread(name)
+    try:
+        yield
+    finally:
+        if previous is None:
+            untag_thread()
+        else:
+            tag_thread(previous)
+
+
+def tag_process(name, pid):
+    with _lock:
+        _processes[pid] = name
+
+
+def untag_process(pid):
+    with _lock:
+        _processes.pop(pid, None)
+
+
+# the interpreter's main thread runs the Qt event loop
+_threads[threading.main_thread().native_id] = "ui"
+
+
+# ---------------- Affinity attribution ---------------- #
+def _core_blocks():
+    """[(subsystem, cores)] from the thread plan, when it's in force and its blocks are disjoint."""
+    thread_budget = sys.modules.get("thread_budget")  # only if it's loaded already
+    if thread_budget is None or not hasattr(os, "sched_getaffinity") or not thread_budget.pinning_enabled():
+        return []
+    blocks = [(name, set(cores)) for name, cores in thread_budget.get_plan().items() if cores]
+    if sum(len(cores) for _, cores in blocks) != len(set().union(*(cores for _, cores in blocks))):
+        return []  # too few cores to split: every subsystem shares them
+    return blocks
+
+
+def _by_affinity(tid, blocks):
+    try:
+        cores = os.sched_getaffinity(tid)  # a thread id works on Linux
+    except OSError:
+        return "other"
+    for name, block in blocks:
+        if cores <= block:
+            return name
+    return "other"
+
+
+# ---------------- Sampling ---------------- #
+class ResourceMonitor:
+    """
+    Takes snapshots of per-thread and per-child-process CPU time. CPU % for a subsystem is its CPU
+    time between the last two snapshots divided by the wall time between them (100% = one core).
+    A thread that changed subsystem between snapshots is charged to its current one.
+    """
+
+    def __init__(self):
+        self.proc = psutil.Process()
+        self._lock = threading.Lock()
+        self._previous = None
+        self._latest = None
+
+    def _snapshot(self):
+        with _lock:
+            threads = dict(_threads)
+            processes = dict(_processes)
+        cpu = {}      # ("t", tid) / ("p", pid) -> (subsystem, cpu seconds)
+        rss = {}      # subsystem -> bytes, for child processes only
+        blocks = _core_blocks()
+        try:
+            for t in self.proc.threads():
+                name = threads.get(t.id) or (_by_affinity(t.id, blocks) if blocks else "other")
+                cpu[("t", t.id)] = (name, t.user_time + t.system_time)
+        except psutil.Error:
+            pass  # per-thread times can need extra privileges on some platforms
+        for pid, name in processes.items():
+            try:
+                child = psutil.Process(pid)
+                with child.oneshot():
+                    times = child.cpu_times()
+                    cpu[("p", pid)] = (name, times.user + times.system)
+                    rss[name] = rss.get(name, 0) + child.memory_info().rss
+                    cpu[("n", pid)] = (name, child.num_threads())
+            except psutil.Error:
+                untag_process(pid)  # exited
+        return {"time": time.monotonic(), "cpu": cpu, "rss": rss,
+                "process_rss": self.proc.memory_info().rss}
+
+    def sample(self):
+        """Take a snapshot; cheap enough to call from a 1 s UI timer."""
+        snap = self._snapshot()
+        with self._lock:
+            self._previous, self._latest = self._latest, snap
+        return snap
+
+    def usage(self):
+        """
+        {subsystem: {'cpu_s', 'cpu_percent', 'threads', 'rss'}} from the two latest snapshots.
+        cpu_percent is None until two snapshots exist; rss is only known for subsystems that run in
+        their own process (threads share the A.T.O.M process' memory).
+        """
+        with self._lock:
+            previous, latest = self._previous, self._latest
+        if latest is None:
+            previous, latest = None, self.sample()
+        elapsed = latest["time"] - previous["time"] if previous else 0
+
+        usage = {name: {"cpu_s": 0.0, "cpu_percent": 0.0 if elapsed else None, "threads": 0,
+                        "rss": latest["rss"].get(name)} for name in SUBSYSTEMS + ("other",)}
+        for key, (name, value) in latest["cpu"].items():
+            entry = usage.setdefault(name, {"cpu_s": 0.0, "cpu_percent": None, "threads": 0, "rss": None})
+            if key[0] == "n":
+                entry["threads"] += value
+                continue
+            if key[0] == "t":
+                entry["threads"] += 1
+            entry["cpu_s"] += value
+            if elapsed and previous and key in previous["cpu"]:
+                entry["cpu_percent"] += max(0.0, value - previous["cpu"][key][1]) / elapsed * 100
+        return usage
+
+    def report(self):
+        """Human readable table for the "atom resources" command."""
+        with self._lock:
+            stale = self._latest is None or time.monotonic() - self._latest["time"] > 0.5
+        if stale:
+            self.sample()  # measured since SystemPanel's last sample (every second) or the last report
+        usage = self.usage()
+        lines = ["A.T.O.M resources (CPU % of one core since the last sample):"]
+        for name, u in sorted(usage.items(), key=lambda kv: -(kv[1]["cpu_percent"] or kv[1]["cpu_s"])):
+            if not u["threads"] and not u["cpu_s"]:
+                continue
+            percent = f"{u['cpu_percent']:5.1f}%" if u["cpu_percent"] is not None else "    –"
+            memory = f", RSS {u['rss'] / 2**20:.0f} MB" if u["rss"] else ""
+            lines.append(f"• {LABELS.get(name, name)}: {percent} CPU, {u['cpu_s']:.1f}s total, "
+                         f"{u['threads']} thread(s){memory}")
+        lines.append(f"A.T.O.M process RSS: {self._latest['process_rss'] / 2**20:.0f} MB")
+        local_engine = sys.modules.get("local_engine")  # only if it's loaded already
+        if local_engine:
+            lines.append(f"Resident model weights: {local_engine.model_pool.used_bytes() / 2**20:.0f} MB")
+        return "\n".join(lines)
+
+
+monitor = ResourceMonitor()
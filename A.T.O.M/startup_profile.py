@@ -0,0 +1,69 @@
+# A.T.O.M/startup_profile.py
+"""
+Startup-time report: per-module import time and time to first paint.
+
+Enabled with the ATOM_PROFILE_STARTUP=1 environment variable. UI_ATOM imports this module first,
+so every import after it is timed. The report is printed and written to ~/A.T.O.M/startup_profile.txt.
+"""
+import builtins
+import os
+import sys
+import time
+from pathlib import Path
+
+T0 = time.perf_counter()
+ENABLED = os.environ.get("ATOM_PROFILE_STARTUP", "") not in ("", "0")
+
+_imports = {}  # top-level module name -> seconds (includes the modules it imports)
+_marks = []    # (label, seconds since T0)
+_original_import = builtins.__import__
+
+
+def _timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+    root = name.partition(".")[0]
+    if level != 0 or root in sys.modules or root in _imports:
+        return _original_import(name, globals, locals, fromlist, level)
+    _imports[root] = None  # claim it so nested imports of the same package aren't timed twice
+    start = time.perf_counter()
+    try:
+        return _original_import(name, globals, locals, fromlist, level)
+    finally:
+        _imports[root] = time.perf_counter() - start
+
+
+def enable():
+    builtins.__import__ = _timed_import
+
+
+def mark(label):
+    """Record a milestone (e.g. 'first paint') relative to process start."""
+    if ENABLED:
+        _marks.append((label, time.perf_counter() - T0))
+
+
+def report(top=25):
+    lines = ["A.T.O.M startup profile", "-" * 40, "Milestones:"]
+    lines += [f"  {seconds * 1000:8.1f} ms  {label}" for label, seconds in _marks]
+    lines.append(f"Slowest imports (top {top}, inclusive of their own imports):")
+    timed = sorted(((s, n) for n, s in _imports.items() if s is not None), reverse=True)
+    lines += [f"  {seconds * 1000:8.1f} ms  {name}" for seconds, name in timed[:top]]
+    return "\n".join(lines)
+
+
+def finish():
+    """Stop timing imports and print/save the report."""
+    if not ENABLED:
+        return
+    builtins.__import__ = _original_import
+    text = report()
+    print(text)
+    try:
+        out = Path.home() / "A.T.O.M" / "startup_profile.txt"
+        out.parent.mkdir(parents=True, exist_ok=True)
+        out.write_text(text, encoding="utf-8")
+    except OSError:
+        pass
+
+
+if ENABLED:
+    enable()
@@ -1,33 +1,477 @@
 # A.T.O.M/summarizer.py
-from local_engine import get_response_from_atom
+from local_engine import get_response_from_atom, load_model, open_replica_pool, model_id, PRIORITY_BATCH
+from llm_cache import ResponseCache
+from resources import subsystem
+from extraction import SUPPORTED_EXTENSIONS
+import extraction_cache
+from PyQt5.QtCore import QSettings
+from pathlib import Path
+import hashlib
+import json
 import re
+import zlib
 
-MAX_TOKENS = 500  # slightly below model context length
-
-def split_into_chunks(text, max_tokens=MAX_TOKENS):
-    """Split text into chunks of <= max_tokens words."""
-    text = re.sub(r'\s+', ' ', text).strip()
-    words = text.split()
-    chunks = []
-    for i in range(0, len(words), max_tokens):
-        chunk = " ".join(words[i:i+max_tokens])
-        chunks.append(chunk)
-    return chunks
-
-def summarize_text(text):
-    """Summarize large text safely in token-sized chunks."""
-    chunks = split_into_chunks(text)
-    summaries = []
+CHUNK_PROMPT = "Summarize this text concisely:\n\n{text}"
+COMBINE_PROMPT = "Combine these summaries into a concise overview:\n\n{text}"
+SUMMARY_TOKENS = 400   # reply reservation per LLM call
+FINAL_TOKENS = 768     # reply reservation for combine calls (the last one is the final summary)
+REDUCE_FAN_IN = 8      # most partial summaries combined by one call (fewer if they don't fit)
+CHUNK_OVERLAP = 64     # tokens of trailing sentences repeated at the start of the next chunk
+SAFETY_MARGIN = 0.95   # per-sentence token counts slightly undercount the joined chunk
+READ_SIZE = 64 * 1024  # characters read at a time from file-like sources
+MAX_PENDING = 20000    # characters buffered without a sentence end before forcing a split
+EXTRACT_BLOCK = 2000   # sentences scored together by the extractive pre-filter
+ANCHOR_FILL = 0.85     # past this fill a chunk may end early at an "anchor" sentence ...
+ANCHOR_EVERY = 4       # ... which is ~1 in ANCHOR_EVERY sentences, chosen by content hash
+PROMPT_VERSION = 1     # bump when the prompts or reply sizes change: invalidates memoized summaries
+MEMO_PATH = Path.home() / "A.T.O.M" / "cache" / "summaries.sqlite3"
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+|\n\s*\n")
+
+
+class SummaryCancelled(Exception):
+    pass
+
+
+def _check(cancel_token):
+    if cancel_token is not None and cancel_token.cancelled:
+        raise SummaryCancelled()
+
+
+# ---------------- Streaming input ---------------- #
+def _pieces(source):
+    """Text pieces from a str, a file object (read in blocks) or any iterable of str."""
+    if isinstance(source, str):
+        yield source
+    elif hasattr(source, "read"):
+        for block in iter(lambda: source.read(READ_SIZE), ""):
+            yield block
+    else:
+        yield from source
+
+
+def iter_sentences(source):
+    """Whitespace-normalized sentences, produced incrementally so the full text is never held in memory."""
+    pending = ""
+    for piece in _pieces(source):
+        pending += piece
+        parts = _SENTENCE_END.split(pending)
+        pending = parts.pop()  # may be an unfinished sentence
+        start = 0
+        while len(pending) - start > MAX_PENDING:  # text without sentence ends: force splits
+            cut = pending.rfind(" ", start, start + MAX_PENDING) + 1 or start + MAX_PENDING
+            parts.append(pending[start:cut])
+            start = cut
+        pending = pending[start:]
+        for part in parts:
+            sentence = " ".join(part.split())
+            if sentence:
+                yield sentence
+    sentence = " ".join(pending.split())
+    if sentence:
+        yield sentence
+
+
+# ---------------- Token-accurate chunking ---------------- #
+def token_counter(model_name=None):
+    """count(text) -> number of tokens with the summarizing model's own tokenizer."""
+    model = load_model(model_name)
+    return lambda text: len(model.tokenize(text))
+
+
+def chunk_budget(model_name=None, prompt=CHUNK_PROMPT, reply_tokens=SUMMARY_TOKENS):
+    """Tokens of text that fit in one call: context minus the prompt template and the reply reservation."""
+    model = load_model(model_name)
+    context = getattr(model, "context_length", 4096)
+    template = len(model.tokenize(prompt.format(text="")))
+    return max(64, int((context - template - reply_tokens) * SAFETY_MARGIN))
+
+
+def _split_word(word, budget, count_tokens):
+    """(piece, tokens) for a word longer than the budget (CJK, base64 ...), cut by characters."""
+    while word:
+        lo, hi = 1, len(word)  # longest prefix that fits; a single character always goes
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if count_tokens(word[:mid]) <= budget:
+                lo = mid
+            else:
+                hi = mid - 1
+        yield word[:lo], count_tokens(word[:lo])
+        word = word[lo:]
+
+
+def _units(sentences, budget, count_tokens):
+    """
+    (text, tokens) per sentence; a sentence longer than the budget is split between words, and a
+    word longer than the budget between characters.
+    """
+    for sentence in sentences:
+        n = count_tokens(sentence)
+        if n <= budget:
+            yield sentence, n
+            continue
+        words, used = [], 0
+        for word in sentence.split(" "):
+            wn = count_tokens(word)
+            if words and used + wn > budget:
+                yield " ".join(words), used
+                words, used = [], 0
+            if wn > budget:
+                yield from _split_word(word, budget, count_tokens)
+                continue
+            words.append(word)
+            used += wn
+        if words:
+            yield " ".join(words), used
+
+
+def stream_chunks(source, budget, overlap=CHUNK_OVERLAP, count_tokens=None):
+    """
+    Pack sentences from `source` (str, file object or iterable of str) into chunks of at most
+    `budget` model tokens. Each chunk starts with the last whole sentences of the previous one,
+    up to `overlap` tokens, so nothing is cut off from its context at a chunk boundary.
+    """
+    return pack_sentences(iter_sentences(source), budget, overlap=overlap, count_tokens=count_tokens)
+
+
+def _is_anchor(sentence):
+    return zlib.crc32(sentence.encode("utf-8")) % ANCHOR_EVERY == 0
+
+
+def pack_sentences(sentences, budget, overlap=CHUNK_OVERLAP, count_tokens=None):
+    """
+    stream_chunks for an iterable of already split sentences.
+    Once a chunk is ANCHOR_FILL full it ends after the next anchor sentence. Anchors depend only
+    on a sentence's own text, so after an edit the chunk boundaries fall back into the same places
+    and the unchanged chunks (and their memoized summaries) stay identical.
+    """
+    count_tokens = count_tokens or token_counter()
+    chunk, used, fresh = [], 0, False
+
+    def overlap_tail():
+        tail, tail_used = [], 0
+        for t, tn in reversed(chunk):
+            if tail_used + tn > overlap:
+                break
+            tail.insert(0, (t, tn))
+            tail_used += tn
+        return tail, tail_used
+
+    for text, n in _units(sentences, budget, count_tokens):
+        if chunk and used + n > budget:
+            yield " ".join(t for t, _ in chunk)
+            tail, tail_used = overlap_tail()
+            chunk, used = (tail, tail_used) if tail_used + n <= budget else ([], 0)
+        chunk.append((text, n))
+        used += n
+        fresh = True
+        if used >= ANCHOR_FILL * budget and _is_anchor(text):
+            yield " ".join(t for t, _ in chunk)
+            chunk, used = overlap_tail()
+            fresh = False
+    if fresh and chunk:
+        yield " ".join(t for t, _ in chunk)
+
+
+def split_into_chunks(text, max_tokens=None, overlap=CHUNK_OVERLAP, model_name=None):
+    """Split text into chunks of <= max_tokens model tokens (default: as many as fit in the context)."""
+    budget = max_tokens or chunk_budget(model_name)
+    return list(stream_chunks(text, budget, overlap=overlap, count_tokens=token_counter(model_name)))
+
+
+# ---------------- Extractive pre-filter ---------------- #
+_WORD = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have he her his i in is it its of on or she that the "
+    "their them they this to was were will with you your we our not no so if then than there these "
+    "those which who what when where how all any can could would should may might also into about".split()
+)
+
+
+def score_sentences(sentences, method="tfidf"):
+    """
+    Informativeness score per sentence (NumPy).
+    tfidf:    cosine similarity of the sentence's TF-IDF vector to the block's centroid
+    textrank: PageRank over the sentence-similarity graph
+    """
+    import numpy as np
+
+    vocab = {}
+    rows, cols = [], []
+    for i, sentence in enumerate(sentences):
+        for word in _WORD.findall(sentence.lower()):
+            if word not in STOPWORDS:
+                rows.append(i)
+                cols.append(vocab.setdefault(word, len(vocab)))
+    n = len(sentences)
+    if not vocab:
+        return np.zeros(n)
+
+    counts = np.zeros((n, len(vocab)), dtype=np.float32)
+    np.add.at(counts, (np.array(rows), np.array(cols)), 1.0)
+    df = np.count_nonzero(counts, axis=0)
+    idf = np.log((1 + n) / (1 + df)) + 1.0
+    tfidf = counts * idf
+    norms = np.linalg.norm(tfidf, axis=1, keepdims=True)
+    tfidf = np.divide(tfidf, norms, out=np.zeros_like(tfidf), where=norms > 0)
 
+    if method == "textrank":
+        sim = tfidf @ tfidf.T
+        np.fill_diagonal(sim, 0.0)
+        out = sim.sum(axis=1, keepdims=True)
+        transition = np.divide(sim, out, out=np.full_like(sim, 1.0 / n), where=out > 0)
+        rank = np.full(n, 1.0 / n)
+        for _ in range(50):
+            new = 0.15 / n + 0.85 * (transition.T @ rank)
+            if np.abs(new - rank).sum() < 1e-6:
+                break
+            rank = new
+        return rank
+
+    centroid = tfidf.mean(axis=0)
+    return tfidf @ centroid
+
+
+def extractive_filter(sentences, keep_ratio=0.5, method="tfidf", count_tokens=None, stats=None,
+                      block=EXTRACT_BLOCK):
+    """
+    Keep the top keep_ratio of sentences by score, in their original order. Sentences are scored
+    in blocks of `block` so the stream never has to be held whole. `stats` (a dict) receives
+    'sentences', 'kept' and, if count_tokens is given, 'tokens_removed'.
+    """
+    import numpy as np
+
+    stats = stats if stats is not None else {}
+    stats.update(sentences=0, kept=0, tokens_removed=0)
+    buffer = []
+
+    def flush():
+        keep = max(1, int(round(len(buffer) * keep_ratio)))
+        scores = score_sentences(buffer, method)
+        chosen = set(np.argsort(-scores, kind="stable")[:keep].tolist())
+        stats["sentences"] += len(buffer)
+        stats["kept"] += keep
+        for i, sentence in enumerate(buffer):
+            if i in chosen:
+                yield sentence
+            elif count_tokens:
+                stats["tokens_removed"] += count_tokens(sentence)
+        buffer.clear()
+
+    for sentence in sentences:
+        buffer.append(sentence)
+        if len(buffer) >= block:
+            yield from flush()
+    if buffer:
+        yield from flush()
+
+
+def prefilter_settings():
+    """(keep_ratio, method) from config: 'summarizer_keep_ratio' (1.0 = off) and 'summarizer_extractive'."""
+    settings = QSettings("A.T.O.M", "Config")
+    return float(settings.value("summarizer_keep_ratio", 1.0)), settings.value("summarizer_extractive", "tfidf")
+
+
+# ---------------- Memoized summaries ---------------- #
+_memo = None
+
+
+def summary_memo():
+    """Persistent store of chunk / combine summaries (same two-tier cache as LLM replies)."""
+    global _memo
+    if _memo is None:
+        _memo = ResponseCache(path=MEMO_PATH, memory_entries=512, disk_entries=200000)
+    return _memo
+
+
+def memo_key(kind, texts, model_key):
+    """Hash of the whitespace-normalized input text(s) + model + prompt version."""
+    normalized = [" ".join(t.split()) for t in texts]
+    raw = json.dumps([PROMPT_VERSION, kind, model_key, normalized], ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+# ---------------- Reduce tree ---------------- #
+def group_summaries(summaries, budget, fan_in=REDUCE_FAN_IN, count_tokens=None):
+    """
+    Consecutive groups of summaries, each within `budget` tokens and at most `fan_in` long.
+    Groups have at least two members except possibly the last, so each level shrinks.
+    """
+    count_tokens = count_tokens or token_counter()
+    groups, group, used = [], [], 0
+    for summary in summaries:
+        n = count_tokens(summary)
+        if len(group) >= 2 and (used + n > budget or len(group) >= fan_in):
+            groups.append(group)
+            group, used = [], 0
+        group.append(summary)
+        used += n
+    if group:
+        groups.append(group)
+    return groups
+
+
+def reduce_summaries(summaries, model_name=None, fan_in=REDUCE_FAN_IN, progress_fn=print, memo=None,
+                     cancel_token=None):
+    """
+    Combine partial summaries level by level until one remains. Every call's prompt fits the
+    context, and with fan_in >= 2 the whole tree costs fewer LLM calls than there are chunks.
+    memo: a summary_memo() to reuse combine results whose inputs haven't changed.
+    """
+    model_key = model_id(model_name) if memo else None
+    fan_in = max(2, fan_in or REDUCE_FAN_IN)
+    budget = chunk_budget(model_name, prompt=COMBINE_PROMPT, reply_tokens=FINAL_TOKENS)
+    count_tokens = token_counter(model_name)
+    level = 0
+    while len(summaries) > 1:
+        level += 1
+        groups = group_summaries(summaries, budget, fan_in=fan_in, count_tokens=count_tokens)
+        calls = sum(len(g) > 1 for g in groups)
+        reduced, done = [], 0
+        for group in groups:
+            if len(group) == 1:
+                reduced.append(group[0])  # a leftover summary moves up a level as is
+                continue
+            done += 1
+            final = len(groups) == 1
+            key = memo_key("final" if final else "combine", group, model_key) if memo else None
+            cached = memo.get(key) if memo else None
+            if cached is not None:
+                if progress_fn: progress_fn(f"♻️ Combining summaries: level {level}, group {done}/{calls} unchanged")
+                reduced.append(cached)
+                continue
+            _check(cancel_token)
+            if progress_fn: progress_fn(f"🔸 Combining summaries: level {level}, group {done}/{calls}")
+            combined = get_response_from_atom(COMBINE_PROMPT.format(text="\n\n".join(group)),
+                                              max_tokens=FINAL_TOKENS if final else SUMMARY_TOKENS,
+                                              priority=PRIORITY_BATCH, model_name=model_name,
+                                              cancel_token=cancel_token, cache=True).strip()
+            _check(cancel_token)  # a cancelled call returns partial text: never store it
+            if memo and combined:
+                memo.put(key, combined)
+            reduced.append(combined)
+        summaries = reduced
+    return summaries[0] if summaries else ""
+
+
+# ---------------- Map phase ---------------- #
+def parallel_enabled():
+    value = QSettings("A.T.O.M", "Config").value("summarizer_parallel", False)
+    return value in (True, "true", "1", 1)
+
+
+def _map_sequential(chunks, model_name, progress_fn, memo=None, model_key=None, cancel_token=None):
+    summaries = []
     for i, chunk in enumerate(chunks):
-        prompt = f"Summarize this text concisely:\n\n{chunk}"
-        print(f"🔹 Summarizing chunk {i+1}/{len(chunks)}...")
-        summary = get_response_from_atom(prompt)
+        _check(cancel_token)
+        key = memo_key("chunk", [chunk], model_key) if memo else None
+        cached = memo.get(key) if memo else None
+        if cached is not None:
+            if progress_fn: progress_fn(f"♻️ Chunk {i+1} unchanged, reusing its summary")
+            summaries.append(cached)
+            continue
+        if progress_fn: progress_fn(f"🔹 Summarizing chunk {i+1}...")
+        summary = get_response_from_atom(CHUNK_PROMPT.format(text=chunk), max_tokens=SUMMARY_TOKENS,
+                                         priority=PRIORITY_BATCH, model_name=model_name,
+                                         cancel_token=cancel_token, cache=True).strip()  # boilerplate pages repeat
+        _check(cancel_token)
+        if memo and summary:
+            memo.put(key, summary)
         summaries.append(summary)
+    return summaries
+
+
+def _map_parallel(chunks, pool, progress_fn, memo=None, model_key=None, cancel_token=None):
+    def report(done, submitted):
+        if progress_fn: progress_fn(f"🔹 Summarized chunk {done}/{submitted} ({len(pool)} replicas)")
+
+    summaries = []  # memoized text, or None where the pool's result goes
+    keys = []
+
+    def prompts():
+        # memo hits are filled in here and never reach the pool
+        for chunk in chunks:
+            if cancel_token is not None and cancel_token.cancelled:
+                return
+            key = memo_key("chunk", [chunk], model_key) if memo else None
+            cached = memo.get(key) if memo else None
+            summaries.append(cached)
+            if cached is None:
+                keys.append(key)
+                yield CHUNK_PROMPT.format(text=chunk)
+
+    generated = [s.strip() for s in pool.map(prompts(), progress_fn=report, cancel_token=cancel_token,
+                                             max_new_tokens=SUMMARY_TOKENS, temperature=0.7, top_p=0.9)]
+    _check(cancel_token)
+    if memo:
+        for key, summary in zip(keys, generated):
+            if summary:
+                memo.put(key, summary)
+    pending = iter(generated)
+    return [s if s is not None else next(pending) for s in summaries]
+
+
+# ---------------- Summarize ---------------- #
+def summarize_text(text, model_name=None, overlap=CHUNK_OVERLAP, fan_in=REDUCE_FAN_IN, progress_fn=print,
+                   parallel=None, replicas=None, keep_ratio=None, extractive="tfidf", memoize=True,
+                   cancel_token=None):
+    """
+    Summarize large text safely: summarize context-sized chunks (map), then combine the partial
+    summaries in a tree (reduce). `text` may also be a file object or an iterable of str; it is
+    then read incrementally. progress_fn(str) receives per-chunk and per-level progress.
+    parallel: run the map phase on several model replica processes (None = 'summarizer_parallel'
+    in config); replicas: how many (None = sized from cores and free RAM).
+    keep_ratio: keep only this share of the most informative sentences before the LLM sees them
+    (extractive: "tfidf" or "textrank"; None = config, see prefilter_settings).
+    memoize: reuse stored summaries of chunks (and reduce groups) whose text hasn't changed, so
+    re-summarizing an edited document only pays for the parts that changed.
+    cancel_token: a local_engine.CancelToken; cancelling raises SummaryCancelled between (and
+    stops the running) LLM calls.
+    """
+    with subsystem("summarizer"):
+        budget = chunk_budget(model_name)
+        count_tokens = token_counter(model_name)
+        if keep_ratio is None:
+            keep_ratio, extractive = prefilter_settings()
+        sentences = iter_sentences(text)
+        stats = {}
+        if 0 < keep_ratio < 1:
+            sentences = extractive_filter(sentences, keep_ratio, method=extractive, count_tokens=count_tokens,
+                                          stats=stats)
+        chunks = pack_sentences(sentences, budget, overlap=overlap, count_tokens=count_tokens)
+        memo = summary_memo() if memoize else None
+        model_key = model_id(model_name) if memoize else None
+
+        pool = None
+        if parallel if parallel is not None else parallel_enabled():
+            pool = open_replica_pool(model_name, replicas=replicas, status_fn=progress_fn)
+        if pool:
+            with pool:
+                summaries = _map_parallel(chunks, pool, progress_fn, memo, model_key, cancel_token)
+        else:
+            summaries = _map_sequential(chunks, model_name, progress_fn, memo, model_key, cancel_token)
+        if stats and progress_fn:
+            progress_fn(f"✂️ Pre-filter kept {stats['kept']}/{stats['sentences']} sentences, "
+                        f"removed {stats['tokens_removed']} tokens")
+
+        return reduce_summaries(summaries, model_name=model_name, fan_in=fan_in, progress_fn=progress_fn,
+                                memo=memo, cancel_token=cancel_token)
+
+
+# ---------------- Documents ---------------- #
+def read_document(file_path):
+    """
+    Text of a .txt / .pdf / .docx file, page by page (PDF) or paragraph by paragraph (see extraction.py).
+    Goes through the extraction cache shared with the file sorter, so unchanged files are read once.
+    """
+    for block in extraction_cache.iter_text(str(file_path)):
+        yield block + "\n\n"  # a page / paragraph end is always a sentence boundary
 
-    # Combine all summaries and summarize again
-    combined = " ".join(summaries)
-    final_prompt = f"Combine these summaries into a concise overview:\n\n{combined}"
-    final_summary = get_response_from_atom(final_prompt)
-    return final_summary
 
+def summarize_file(file_path, progress_fn=print, cancel_token=None, **options):
+    """
+    The one document pipeline used by command.summarize_file and the terminal's summarizer worker:
+    stream the document's text into summarize_text. Returns "" when there's no readable text.
+    """
+    return summarize_text(read_document(file_path), progress_fn=progress_fn, cancel_token=cancel_token, **options)
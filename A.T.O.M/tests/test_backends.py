@@ -0,0 +1,73 @@
+# A.T.O.M/tests/test_backends.py
+import http.server
+import json
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backends import OllamaBackend
+
+
+class OllamaStub(http.server.BaseHTTPRequestHandler):
+    """/api/tags lists one model; /api/generate streams one NDJSON line per word of the prompt."""
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real daemon
+    requests = []
+    clients = set()
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, lines):
+        body = "".join(json.dumps(line) + "\n" for line in lines).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Content-Length", len(body))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        OllamaStub.clients.add(self.client_address)
+        self._reply([{"models": [{"name": "phi3:mini"}]}])
+
+    def do_POST(self):
+        OllamaStub.clients.add(self.client_address)
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        OllamaStub.requests.append(payload)
+        words = payload["prompt"].split()[:payload.get("options", {}).get("num_predict", 0)]
+        self._reply([{"response": f"{word} ", "done": False} for word in words] + [{"response": "", "done": True}])
+
+
+@pytest.fixture
+def base_url():
+    OllamaStub.requests, OllamaStub.clients = [], set()
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), OllamaStub)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_load_checks_the_tag_and_preloads_the_model(base_url):
+    backend = OllamaBackend(base_url=base_url).load("phi3", context_length=2048, threads=3)
+    assert backend.context_length == 2048
+    preload = OllamaStub.requests[-1]
+    assert preload["model"] == "phi3" and preload["prompt"] == ""
+
+
+def test_load_rejects_a_model_the_daemon_does_not_have(base_url):
+    with pytest.raises(RuntimeError, match="ollama pull llama3"):
+        OllamaBackend(base_url=base_url).load("llama3")
+
+
+def test_stream_yields_the_ndjson_pieces_over_one_connection(base_url):
+    backend = OllamaBackend(base_url=base_url).load("phi3:mini", threads=3)
+    pieces = list(backend.stream("one two three four", max_new_tokens=3, temperature=0))
+    assert pieces == ["one ", "two ", "three "]
+    assert backend.generate("five six", max_new_tokens=8) == "five six "
+    options = OllamaStub.requests[-1]["options"]
+    assert options["num_thread"] == 3 and options["num_predict"] == 8
+    assert len(OllamaStub.clients) == 1  # the session kept the connection alive
@@ -0,0 +1,115 @@
+# A.T.O.M/tests/test_downloader.py
+import hashlib
+import http.server
+import os
+import re
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import downloader
+
+DATA = os.urandom(3 * 1024 * 1024)
+SHA256 = hashlib.sha256(DATA).hexdigest()
+
+
+class RangeServer(http.server.BaseHTTPRequestHandler):
+    """Serves DATA with Range support; the next `fail` responses are cut off a third of the way in."""
+    ranges = []
+    fail = 0
+
+    def log_message(self, *args):
+        pass
+
+    def do_HEAD(self):
+        self.send_response(200)
+        self.send_header("Content-Length", len(DATA))
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("ETag", f'"{SHA256}"')
+        self.end_headers()
+
+    def do_GET(self):
+        match = re.match(r"bytes=(\d+)-(\d*)", self.headers.get("Range", ""))
+        if match:
+            start = int(match.group(1))
+            end = int(match.group(2) or len(DATA) - 1)
+            body = DATA[start:end + 1]
+            RangeServer.ranges.append((start, end))
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{len(DATA)}")
+        else:
+            body = DATA
+            self.send_response(200)
+        self.send_header("Content-Length", len(body))
+        self.end_headers()
+        if RangeServer.fail > 0:
+            RangeServer.fail -= 1
+            body = body[:len(body) // 3]
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def url():
+    RangeServer.ranges, RangeServer.fail = [], 0
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), RangeServer)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}/model.gguf"
+    server.shutdown()
+    server.server_close()
+
+
+def test_resumes_an_interrupted_download(url, tmp_path):
+    dest = tmp_path / "model.gguf"
+    RangeServer.fail = 1
+    assert not downloader.download_file(url, dest, connections=1)
+    assert not dest.exists()
+    partial = os.path.getsize(f"{dest}.part")
+    assert 0 < partial < len(DATA)
+
+    assert downloader.download_file(url, dest, connections=1)
+    assert RangeServer.ranges[-1][0] == partial  # only the missing bytes were fetched
+    assert dest.read_bytes() == DATA
+    assert not os.path.exists(f"{dest}.part")
+
+
+def test_fetches_ranges_over_several_connections(url, tmp_path, monkeypatch):
+    monkeypatch.setattr(downloader, "MIN_SEGMENT", 512 * 1024)
+    dest = tmp_path / "model.gguf"
+    progress = []
+    assert downloader.download_file(url, dest, connections=4, progress_fn=progress.append)
+    assert len({start for start, _ in RangeServer.ranges}) == 4
+    assert dest.read_bytes() == DATA
+    assert progress[-1] == 100
+    assert not os.path.exists(f"{dest}.part.json")
+
+
+def test_resumes_segments_after_an_interruption(url, tmp_path, monkeypatch):
+    monkeypatch.setattr(downloader, "MIN_SEGMENT", 512 * 1024)
+    monkeypatch.setattr(downloader, "CHUNK_SIZE", 64 * 1024)  # progress is saved per chunk
+    dest = tmp_path / "model.gguf"
+    RangeServer.fail = 4
+    assert not downloader.download_file(url, dest, connections=4)
+    assert os.path.exists(f"{dest}.part.json")
+
+    RangeServer.ranges = []
+    assert downloader.download_file(url, dest, connections=4)
+    assert dest.read_bytes() == DATA
+    assert sum(end - start + 1 for start, end in RangeServer.ranges) < len(DATA)
+
+
+def test_removes_the_part_file_on_checksum_mismatch(url, tmp_path):
+    dest = tmp_path / "model.gguf"
+    assert not downloader.download_file(url, dest, connections=1, sha256="0" * 64)
+    assert not dest.exists()
+    assert not os.path.exists(f"{dest}.part")
+
+
+def test_removes_the_part_file_on_size_mismatch(url, tmp_path):
+    dest = tmp_path / "model.gguf"
+    assert not downloader.download_file(url, dest, connections=1, expected_size=len(DATA) + 1)
+    assert not dest.exists()
+    assert not os.path.exists(f"{dest}.part")
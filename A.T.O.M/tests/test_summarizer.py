@@ -0,0 +1,32 @@
+# A.T.O.M/tests/test_summarizer.py
+import io
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import summarizer
+
+
+def test_iter_sentences_splits_text_without_sentence_ends():
+    text = "word " * 1_600_000  # 8 MB, no ". " and no blank lines
+    start = time.perf_counter()
+    sentences = list(summarizer.iter_sentences(text))
+    assert time.perf_counter() - start < 5
+    assert max(len(s) for s in sentences) <= summarizer.MAX_PENDING
+    assert sum(len(s.split()) for s in sentences) == 1_600_000
+
+
+def test_iter_sentences_bounds_pending_across_reads():
+    source = io.StringIO("word " * 200_000)  # 1 MB read in READ_SIZE blocks, no sentence ends
+    sentences = list(summarizer.iter_sentences(source))
+    assert max(len(s) for s in sentences) <= summarizer.MAX_PENDING
+    assert sum(len(s.split()) for s in sentences) == 200_000
+
+
+def test_stream_chunks_splits_words_longer_than_the_budget():
+    count_tokens = lambda text: len(text) // 4
+    chunks = list(summarizer.stream_chunks("x" * 100_000, 1000, count_tokens=count_tokens))
+    assert max(count_tokens(c) for c in chunks) <= 1000
+    assert sum(len(c) for c in chunks) == 100_000
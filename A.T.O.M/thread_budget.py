@@ -0,0 +1,127 @@
+# A.T.O.M/thread_budget.py
+"""
+Splits the machine's cores between the LLM, Coqui TTS and speech recognition so they stop
+oversubscribing each other (e.g. TTS of reply N running while reply N+1 generates).
+
+    config 'thread_budget'   JSON shares, default {"llm": 0.65, "tts": 0.25, "asr": 0.1}
+    config 'thread_pinning'  false = only size the thread pools, don't pin
+    config 'thread_plan'     written here: the resulting {subsystem: [cores]} (for inspection)
+
+Each subsystem's own threads call pin_thread(name) when they start. Native pools (ggml, torch
+intra-op) are created from those threads, so they inherit the affinity. Pinning single threads
+needs os.sched_setaffinity (Linux); elsewhere only the thread counts are applied, plus
+psutil's process affinity for the out-of-process engine.
+"""
+import json
+import os
+import threading
+
+import psutil
+from PyQt5.QtCore import QSettings
+
+DEFAULT_BUDGET = {"llm": 0.65, "tts": 0.25, "asr": 0.1}
+MIN_CORES_TO_SPLIT = 4  # below this everything shares all cores
+
+_lock = threading.Lock()
+_plan = None
+
+
+def available_cores():
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    try:
+        return sorted(psutil.Process().cpu_affinity())
+    except (AttributeError, psutil.Error):
+        return list(range(psutil.cpu_count(logical=True) or 1))
+
+
+def _budget():
+    raw = QSettings("A.T.O.M", "Config").value("thread_budget", None)
+    if raw:
+        try:
+            budget = {k: float(v) for k, v in json.loads(raw).items()}
+            if budget.get("llm", 0) > 0:
+                return budget
+        except (ValueError, AttributeError):
+            pass
+    return dict(DEFAULT_BUDGET)
+
+
+def make_plan(cores=None, budget=None):
+    """
+    {subsystem: [core ids]} — disjoint blocks sized by the budget shares. The LLM gets the first
+    (lowest-numbered) block, which on Linux are distinct physical cores before SMT siblings.
+    """
+    cores = list(cores if cores is not None else available_cores())
+    budget = budget or _budget()
+    if len(cores) < MIN_CORES_TO_SPLIT:
+        return {name: cores for name in budget}
+
+    total = sum(budget.values())
+    counts = {name: max(1, round(len(cores) * share / total)) for name, share in budget.items() if name != "llm"}
+    while sum(counts.values()) > len(cores) - 1:  # the LLM always keeps at least one core
+        largest = max(counts, key=counts.get)
+        counts[largest] -= 1
+        if counts[largest] == 0:
+            del counts[largest]
+    plan = {"llm": cores[:len(cores) - sum(counts.values())]}
+    start = len(plan["llm"])
+    for name, n in counts.items():
+        plan[name] = cores[start:start + n]
+        start += n
+    return plan
+
+
+def get_plan():
+    """The current plan (computed once per run and written to config 'thread_plan')."""
+    global _plan
+    with _lock:
+        if _plan is None:
+            _plan = make_plan()
+            QSettings("A.T.O.M", "Config").setValue("thread_plan", json.dumps(_plan))
+        return _plan
+
+
+def replan():
+    """Recompute after 'thread_budget' changed. Threads pick it up the next time they pin."""
+    global _plan
+    with _lock:
+        _plan = None
+    return get_plan()
+
+
+def pinning_enabled():
+    value = QSettings("A.T.O.M", "Config").value("thread_pinning", True)
+    return value not in (False, "false", "0", 0)
+
+
+def cores_for(name):
+    return get_plan().get(name) or available_cores()
+
+
+def thread_count(name):
+    """Threads the subsystem's compute pool should use: its cores, at most the physical core count."""
+    physical = psutil.cpu_count(logical=False) or len(available_cores())
+    return max(1, min(len(cores_for(name)), physical))
+
+
+def pin_thread(name):
+    """Pin the calling thread (and native threads it creates later) to the subsystem's cores."""
+    if not pinning_enabled() or not hasattr(os, "sched_setaffinity"):
+        return False
+    try:
+        os.sched_setaffinity(0, cores_for(name))  # pid 0 = calling thread on Linux
+        return True
+    except OSError:
+        return False
+
+
+def pin_process(name, pid):
+    """Pin a helper process (e.g. the engine process) to the subsystem's cores."""
+    if not pinning_enabled():
+        return False
+    try:
+        psutil.Process(pid).cpu_affinity(cores_for(name))
+        return True
+    except (AttributeError, psutil.Error, OSError):
+        return False
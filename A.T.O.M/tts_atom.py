@@ -3,12 +3,15 @@ import threading
 import queue
 import tempfile
 import os
-from TTS.api import TTS
+import re
 from pydub import AudioSegment, effects
 from pydub.playback import play
 import builtins
 import io
 import contextlib
+from resources import subsystem, tag_thread
+from power_profiles import tts_effects_enabled
+from thread_budget import pin_thread, thread_count
 
 # --- Suppress unwanted Coqui TTS prints globally ---
 def block_print(*args, **kwargs):
@@ -21,9 +24,34 @@ old_print = builtins.print
 builtins.print = block_print
 
 # -------------------------------
-# Load Coqui TTS model (multi-speaker VCTK)
+# Coqui TTS model (multi-speaker VCTK)
+# Loaded on first use / by preload_tts(): importing TTS pulls in torch and building the model takes
+# seconds, which used to happen while the UI was starting.
 # -------------------------------
-tts = TTS("tts_models/en/vctk/vits")
+tts = None
+_tts_lock = threading.Lock()
+
+
+def get_tts():
+    global tts
+    with _tts_lock:
+        if tts is None:
+            import torch
+            from TTS.api import TTS
+            torch.set_num_threads(thread_count("tts"))  # torch's pool is only used by TTS in this process
+            tts = TTS("tts_models/en/vctk/vits")
+        return tts
+
+
+def _preload():
+    with subsystem("tts"):  # a short-lived thread: untagged again before the OS reuses its id
+        pin_thread("tts")
+        get_tts()
+
+
+def preload_tts():
+    """Load the TTS model in the background so the first reply doesn't wait for it."""
+    threading.Thread(target=_preload, daemon=True).start()
 
 # Choose speaker
 TARGET_SPEAKER = "p246"  # calm female
@@ -63,26 +91,32 @@ def voice_model_settings(input_file, output_file):
 
 
 def tts_worker():
+    tag_thread("tts")
+    pin_thread("tts")
     while True:
         text = tts_queue.get()
         if text is None:  # Shutdown signal
             break
 
+        tmp_path = processed_path = None  # get_tts() may fail before either file exists
         try:
             # Generate raw TTS to a temp file with target speaker
             with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as tmp:
                 tmp_path = tmp.name
                 buffer = io.StringIO()
                 with contextlib.redirect_stdout(buffer):  # hide noisy Coqui logs
-                    tts.tts_to_file(
+                    get_tts().tts_to_file(
                         text=text,
                         file_path=tmp_path,
                         speaker=TARGET_SPEAKER
                     )
 
-            # Apply filter
+            # Apply filter (skipped by the battery / thermal power profiles)
             processed_path = tmp_path.replace(".wav", "_processed.wav")
-            voice_model_settings(tmp_path, processed_path)
+            if tts_effects_enabled():
+                voice_model_settings(tmp_path, processed_path)
+            else:
+                processed_path = tmp_path
 
             # Play processed sound
             play(AudioSegment.from_file(processed_path))
@@ -92,9 +126,9 @@ def tts_worker():
 
         finally:
             # Clean up
-            if os.path.exists(tmp_path):
+            if tmp_path and os.path.exists(tmp_path):
                 os.remove(tmp_path)
-            if os.path.exists(processed_path):
+            if processed_path and os.path.exists(processed_path):
                 os.remove(processed_path)
             tts_queue.task_done()
 
@@ -106,3 +140,43 @@ threading.Thread(target=tts_worker, daemon=True).start()
 def speak_response(text):
     """Add text to the TTS queue to be spoken sequentially."""
     tts_queue.put(text)
+
+
+# -------------------------------
+# Streaming: speak sentence by sentence while the LLM is still generating
+# -------------------------------
+# A sentence ends at . ! ? followed by whitespace (so "3.14" or "e.g.x" don't split) or at a newline.
+_SENTENCE_END = re.compile(r"[.!?](?=\s)|\n")
+
+
+class StreamSpeaker:
+    """Buffer streamed tokens and queue each completed sentence for speech."""
+
+    def __init__(self):
+        self.buffer = ""
+
+    def feed(self, token):
+        self.buffer += token
+        match = _SENTENCE_END.search(self.buffer)
+        while match:
+            sentence = self.buffer[:match.end()].strip()
+            self.buffer = self.buffer[match.end():]
+            if sentence:
+                speak_response(sentence)
+            match = _SENTENCE_END.search(self.buffer)
+
+    def flush(self):
+        """Speak whatever is left once the stream has finished."""
+        rest = self.buffer.strip()
+        self.buffer = ""
+        if rest:
+            speak_response(rest)
+
+
+def speak_stream(tokens):
+    """Pass tokens through unchanged while speaking them at sentence boundaries."""
+    speaker = StreamSpeaker()
+    for token in tokens:
+        speaker.feed(token)
+        yield token
+    speaker.flush()
@@ -2,6 +2,9 @@
 import threading
 import time
 
+from resources import subsystem
+from thread_budget import pin_thread
+
 try:
     import speech_recognition as sr
 except Exception:
@@ -37,6 +40,12 @@ def listen_to_user(timeout=5, phrase_time_limit=10):
 
 
 def _listen_loop(timeout=5, phrase_time_limit=10):
+    with subsystem("asr"):  # untagged when listening stops: the OS reuses the thread id
+        pin_thread("asr")
+        _listen(timeout, phrase_time_limit)
+
+
+def _listen(timeout, phrase_time_limit):
     global _listening, _callback
     if sr is None:
         # Nothing to do; call callback once with None so UI can update
@@ -1,9 +1,13 @@
 import os
+import sys
 import shutil
-import fitz  # PyMuPDF for PDFs
-import docx  # for dox
 import nltk  # tokenizer
 
+# shared streaming extractor (PyMuPDF / PyPDF2, python-docx) lives with A.T.O.M
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "A.T.O.M"))
+import extraction
+import extraction_cache
+
 nltk.download('punkt_tab')
 from nltk.tokenize import word_tokenize
 
@@ -26,26 +30,14 @@ for folder in CATEGORIES.keys():
     os.makedirs(os.path.join(DEST_FOLDER, folder), exist_ok=True)
 
 def extract_text(file_path):
-    """Extract text from PDF or DOCX files."""
+    """Extract text from PDF, DOCX or TXT files."""
     ext = os.path.splitext(file_path)[1].lower()
-    
-    if ext == ".pdf":
-        # Extract text from PDF using PyMuPDF (fitz)
-        doc = fitz.open(file_path)
-        text = " ".join([page.get_text("text") for page in doc])
-        return text
 
-    elif ext == ".docx":
-        # Extracting text from DOCX using python-docx 
-        doc = docx.Document(file_path)
-        text = " ".join([p.text for p in doc.paragraphs])
-        return text
+    if ext in extraction.SUPPORTED_EXTENSIONS:
+        # pages / paragraphs are streamed and joined once (PyMuPDF for PDFs when installed);
+        # files extracted before (here or by A.T.O.M's summarizer) come from the shared cache
+        return " ".join(extraction_cache.iter_text(file_path))
 
-    elif ext == ".txt":
-        # For text files,read the content
-        with open(file_path, "r", encoding="utf-8") as f:
-            return f.read()
-    
     return ""
 
 def categorize_file(file_name, file_path):